@@ -0,0 +1,2981 @@
+"""
+[Blender and Python] Model Views Exporter
+Mina Pêcheux - January 2022
+Email: mina.pecheux@gmail.com
+
+A simple Blender addon to quickly prepare and export various views of a 3D model
+from common points of view (front, side, top...). To choose the model to export,
+simply select it.
+
+If the selected object is a mesh, only still images will be produced. Otherwise,
+all the actions in the scene will be listed and you can choose which one to apply
+and export.
+
+More info on how I developed the plugin:
+    
+    - https://medium.com/p/how-i-automated-the-marketing-of-my-blender-3d-models-1-2-bc4f0454dfc3
+    - https://medium.com/p/how-i-automated-the-marketing-of-my-blender-3d-models-2-2-4687e5625e
+
+--------
+
+MIT License
+
+Copyright (c) 2022 Mina Pêcheux
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+bl_info = {
+    # required
+    'name': 'Model Views Exporter',
+    'blender': (2, 93, 0),
+    'category': 'Import-Export',
+    # optional
+    'version': (1, 0, 0),
+    'author': 'Mina Pêcheux',
+    'description': 'Export various views of a 3D model (front, side, top...), static or animated.',
+}
+
+
+import argparse
+import bpy
+import contextlib
+import hashlib
+import io
+import json
+import numpy as np
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from concurrent import futures
+from math import ceil, pi
+from mathutils import Matrix, Vector
+
+# (the export planner is the bpy-free plan module of this package - when this
+# file is run as a script, it is made the package of its folder to find it)
+if not __package__:
+    __path__ = [os.path.dirname(os.path.abspath(__file__))]
+    __package__ = '__main__'
+from .plan import (
+    POVs, MOVIE_EXTENSIONS, SHARD_KEYS, make_camera_spec, get_orbit_placements,
+    parse_elevations, fill_object_name, parse_sizes, plan_export, job_frame_count,
+    get_sheet_layout, plan_frame_count, dedupe_jobs, sort_jobs, shard_jobs, batch_key,
+    batch_jobs, count_action_batches, sample_keyframes, get_pose_sources,
+    skip_unchanged_jobs, skip_completed_jobs, select_jobs, describe_plan,
+    resample_pixels, encode_png)
+
+try:
+    # (optional, to write the JPEG stills in the background)
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# == GLOBAL VARIABLES
+class POVProp(bpy.types.PropertyGroup):
+    name : bpy.props.StringProperty(name='Name', default='')
+    enabled : bpy.props.BoolProperty(
+        name='Enabled', default=True, description='Export with this point of view')
+    suffix : bpy.props.StringProperty(
+        name='Suffix', default='', description='Suffix to add to the exported images/clips file paths')
+
+class AnimationProp(bpy.types.PropertyGroup):
+    name : bpy.props.StringProperty(name='Name', default='')
+    enabled : bpy.props.BoolProperty(
+        name='Enabled', default=True, description='Export this animation')
+    anchor : bpy.props.PointerProperty(
+        name='Anchor', type=bpy.types.Object, description='Anim-specific camera anchor')
+
+bpy.utils.register_class(POVProp)
+bpy.utils.register_class(AnimationProp)
+
+# (the plain MP4 format uses a fixed quality, the H.264 one the chosen CRF)
+MP4_CRF = 18
+FFMPEG_CODECS = {
+    # (libx264 needs even sizes)
+    'MP4': ['-c:v', 'libx264', '-crf', str(MP4_CRF), '-pix_fmt', 'yuv420p',
+        '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2'],
+    'AVI JPEG': ['-c:v', 'mjpeg', '-q:v', '2'],
+    'H264': ['-c:v', 'libx264', '-crf', '{crf}', '-preset', 'medium', '-pix_fmt', 'yuv420p',
+        '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2'],
+    'WEBM': ['-c:v', 'libvpx-vp9', '-crf', '{crf}', '-b:v', '0'],
+    'LOSSLESS': ['-c:v', 'ffv1', '-level', '3'],
+}
+# (Blender's own encoder only has quality presets)
+BLENDER_CRF_PRESETS = [
+    (0, 'LOSSLESS'), (17, 'PERC_LOSSLESS'), (20, 'HIGH'), (23, 'MEDIUM'),
+    (26, 'LOW'), (29, 'VERYLOW'), (32, 'LOWEST'),
+]
+
+PROPS = [
+    ('prefix', bpy.props.StringProperty(
+        name='Prefix', default='', description='Prefix to add to all export file paths')),
+    ('anchor', bpy.props.PointerProperty(
+        name='Anchor', type=bpy.types.Object, description='Custom camera anchor')),
+    ('do_wireframes', bpy.props.BoolProperty(
+        name='Do Wireframes', default=True, description='Export all images/clips with a secondary wireframe version')),
+    ('wireframe_suffix', bpy.props.StringProperty(
+        name='Wireframe Suffix', default='_wireframe', description='Suffix to add to all wireframe export file paths')),
+    ('base_path', bpy.props.StringProperty(
+        name='Export Path', default='./', subtype='DIR_PATH',
+        description='Path to the export folder')),
+    ('batch_mode', bpy.props.EnumProperty(
+        name='Models', default='ACTIVE',
+        description='Objects to export (all the paths can contain {object}, '
+            'replaced by the name of each model)',
+        items=[
+            # (identifier, name, description)
+            ('ACTIVE', 'Active Object', 'Export the active object'),
+            ('SELECTED', 'Selected Objects', 'Export each selected object in turn'),
+            ('COLLECTION', 'Collection', 'Export each object of a collection in turn'),
+        ])),
+    ('batch_collection', bpy.props.PointerProperty(
+        name='Collection', type=bpy.types.Collection,
+        description='Collection of the objects to export')),
+    ('export_resolution', bpy.props.IntVectorProperty(
+        name='Export Resolution', subtype='TRANSLATION', size=2, default=(1920, 1080),
+        description='Width/Height to use for the exported images/clips')),
+    ('extra_sizes', bpy.props.StringProperty(
+        name='Extra Sizes', default='',
+        description='Other sizes of the still images (e.g. "3840x2160, 512x512, 128x128") - '
+            'the images are rendered once at the largest size and resized')),
+    ('export_img_format', bpy.props.EnumProperty(
+        name='Image Format', default='PNG',
+        description='Output format for the image (still) exports',
+        items=[
+            # (identifier, name, description)
+            ('JPEG', 'JPEG', 'Export as JPG'),
+            ('PNG', 'PNG', 'Export as PNG'),
+        ])),
+    ('export_movie_format', bpy.props.EnumProperty(
+        name='Movie Format', default='MP4',
+        description='Output format for the anim/turnaround exports',
+        items=[
+            # (identifier, name, description)
+            ('MP4', 'MP4', 'Export as MP4'),
+            ('AVI JPEG', 'AVI JPEG', 'Export as AVI JPEG'),
+            ('H264', 'H.264', 'Export as MP4 with the H.264 codec and the chosen quality'),
+            ('WEBM', 'WebM', 'Export as WebM with the VP9 codec and the chosen quality'),
+            ('LOSSLESS', 'Lossless', 'Export as MKV with the lossless FFV1 codec'),
+            ('SPRITE_SHEET', 'Sprite Sheet',
+                'Export the frames packed in PNG atlases, with a JSON index of the frames'),
+        ])),
+    ('sprite_sheet_max_size', bpy.props.IntProperty(
+        name='Max Sheet Size', default=4096, min=64,
+        description='Maximum width/height of a sprite sheet (the frames are split '
+            'between several sheets if need be)')),
+    ('sprite_sheet_wireframes', bpy.props.BoolProperty(
+        name='Wireframes In Sheet', default=False,
+        description='Pack the wireframe frames in the same sprite sheets as the solid ones')),
+    ('movie_crf', bpy.props.IntProperty(
+        name='Movie Quality (CRF)', default=18, min=0, max=51,
+        description='Constant rate factor for the H.264/WebM exports (lower is better)')),
+    ('export_ortho_scale', bpy.props.FloatProperty(
+        name='Ortho scale', default=1.0,
+        description='Output orthographic zoom multiplier')),
+    ('bg_is_transparent', bpy.props.BoolProperty(
+        name='Bg Is Transparent', default=False, description='Set a transparent or opaque export background')),
+    ('bg_color', bpy.props.FloatVectorProperty(
+        name='Bakground Color', subtype='COLOR', default=(0.057, 0.057, 0.057),
+        description='Background color for all exports')),
+    ('camera_distance', bpy.props.FloatProperty(
+        name='Camera Distance', default=1.0, description='Distance to the target object')),
+    ('turnaround_length', bpy.props.IntProperty(
+        name='Turnaround Length', default=160, description='Number of frames for the turnarounds')),
+    ('turnaround_height', bpy.props.FloatProperty(
+        name='Turnaround Height', default=0.2, description='Height of the camera for the turnarounds')),
+    ('spinset_angles', bpy.props.IntProperty(
+        name='Spin Set Angles', default=36, min=1,
+        description='Number of images around the model for the spin sets')),
+    ('spinset_elevations', bpy.props.StringProperty(
+        name='Spin Set Elevations', default='0',
+        description='Elevations of the camera for the spin sets, in degrees (e.g. "0, 15, 30")')),
+    ('frame_major', bpy.props.BoolProperty(
+        name='Single Anim Pass', default=False,
+        description='Render the solid and wireframe frames of each animation in the same pass (requires FFmpeg)')),
+    ('multi_camera', bpy.props.BoolProperty(
+        name='All POVs Per Frame', default=False,
+        description='Render each animation frame from all the points of view at once (requires FFmpeg)')),
+    ('use_export_cache', bpy.props.BoolProperty(
+        name='Skip Unchanged', default=False,
+        description='Only re-export the images/clips whose inputs changed since the last export')),
+    ('resume_export', bpy.props.BoolProperty(
+        name='Resume', default=False,
+        description='Skip the images/clips that a previous, interrupted export completed '
+            '(according to the journal of the export folder)')),
+    ('use_animated_framing', bpy.props.BoolProperty(
+        name='Fit Animations', default=False,
+        description='Frame each animation on the bounds of the animated meshes over all its frames')),
+    ('isolate_model', bpy.props.BoolProperty(
+        name='Isolate Model', default=False,
+        description='Exclude the collections and objects unrelated to the model from the '
+            'scene during the export')),
+    ('use_simplify', bpy.props.BoolProperty(
+        name='Simplify', default=False,
+        description='Cap the subdivision levels of the scene during the export')),
+    ('simplify_subdivision', bpy.props.IntProperty(
+        name='Max Subdivision', default=2, min=0, max=6,
+        description='Maximum subdivision level during the export')),
+    ('pose_cache', bpy.props.EnumProperty(
+        name='Pose Cache', default='NONE',
+        description='Deform the meshes once per animation and reuse the positions for all '
+            'the points of view and passes, instead of evaluating the rig again',
+        items=[
+            # (identifier, name, description)
+            ('NONE', 'None', 'Evaluate the rig for each render'),
+            ('MEMORY', 'Memory', 'Keep the deformed positions in memory'),
+            ('DISK', 'Disk', 'Keep the deformed positions in memory-mapped temporary files'),
+        ])),
+    ('skip_held_frames', bpy.props.BoolProperty(
+        name='Skip Held Frames', default=False,
+        description='Render held poses of the animations only once and reuse them for the following frames (requires FFmpeg)')),
+    ('use_background_writer', bpy.props.BoolProperty(
+        name='Write In Background', default=False,
+        description='Encode and write the images in background threads while the next ones render '
+            '(JPEG images need the PIL module, else they are written by Blender)')),
+    ('writer_threads', bpy.props.IntProperty(
+        name='Writer Threads', default=2, min=1,
+        description='Number of threads writing the images at the same time')),
+    ('png_compression', bpy.props.IntProperty(
+        name='PNG Compression', default=15, min=0, max=100, subtype='PERCENTAGE',
+        description='Compression of the PNG images (higher is smaller, but slower)')),
+    ('use_background_encoding', bpy.props.BoolProperty(
+        name='Encode In Background', default=False,
+        description='Render the clips as frame sequences and encode them with FFmpeg while the next clips render')),
+    ('encoder_processes', bpy.props.IntProperty(
+        name='Encoder Processes', default=2, min=1,
+        description='Maximum number of FFmpeg processes encoding at the same time')),
+    ('write_export_report', bpy.props.BoolProperty(
+        name='Write Report', default=False,
+        description='Write a JSON report and a Chrome trace of the export timings in the export folder')),
+    ('ffmpeg_path', bpy.props.StringProperty(
+        name='FFmpeg Path', default='ffmpeg', subtype='FILE_PATH',
+        description='Path to the FFmpeg executable used to encode the frame sequences')),
+    ('povs', bpy.props.CollectionProperty(name='POVs', type=POVProp)),
+    ('animations', bpy.props.CollectionProperty(name='Animations', type=AnimationProp)),
+    ('animations_index', bpy.props.IntProperty(name='Active Animation', default=0)),
+]
+
+# == UTILS
+def camera_matrix(spec, anchor_location):
+    # (same placement as the tracking camera, computed directly)
+    offset, _ = POVs[spec.pov]
+    d = 3 * spec.distance # (arbitrary distance to avoid clipping)
+    anchor_location = Vector(anchor_location)
+    location = anchor_location + Vector((d * offset[0], d * offset[1], d * spec.height))
+    rotation = (anchor_location - location).to_track_quat('-Z', 'Y')
+    return Matrix.Translation(location) @ rotation.to_matrix().to_4x4()
+
+class CameraRig:
+    # (one persistent camera created through bpy.data, moved and reconfigured
+    # for each job instead of being re-created)
+
+    def __init__(self, scene, auto_anchor_location):
+        self.scene = scene
+        self.auto_anchor_location = Vector(auto_anchor_location)
+        self.spec = None
+        self.camera = bpy.data.objects.new('MVE_Camera', bpy.data.cameras.new('MVE_Camera'))
+        self.camera.data.type = 'ORTHO'
+        scene.collection.objects.link(self.camera)
+        # (only used for turnarounds around a custom anchor)
+        self.track = self.camera.constraints.new('TRACK_TO')
+        self.track.track_axis = 'TRACK_NEGATIVE_Z'
+        self.track.up_axis = 'UP_Y'
+        self.track.mute = True
+        self.pivot = None
+        self.pivot_action = None
+        self.spin_pivot = None
+        self.spin_action = None
+
+    def activate(self, spec):
+        if spec == self.spec:
+            return
+        anchor = bpy.data.objects[spec.anchor] if spec.anchor is not None else None
+        if anchor is not None:
+            anchor_location = anchor.location
+        elif spec.target is not None:
+            anchor_location = Vector(spec.target)
+        else:
+            anchor_location = self.auto_anchor_location
+        self.camera.data.ortho_scale = spec.ortho_scale
+        if spec.pov == 'spinset':
+            # (the views are keyframed on the camera, around a pivot on the anchor)
+            self.setup_spin_set(spec, anchor_location)
+            self.camera.parent = self.spin_pivot
+            self.track.mute = True
+            self.camera.animation_data.action = self.spin_action
+            self.scene.camera = self.camera
+            self.spec = spec
+            return
+        if self.camera.animation_data is not None:
+            self.camera.animation_data.action = None
+        matrix = camera_matrix(spec, anchor_location)
+        if spec.pov == 'turnaround':
+            # (the pivot rotates around the vertical axis of the anchor)
+            self.setup_turnaround(spec.length)
+            self.pivot.location = (anchor_location[0], anchor_location[1], 0)
+            self.camera.parent = self.pivot
+            matrix = Matrix.Translation(-self.pivot.location) @ matrix
+            # (the auto anchor is on the rotation axis so the camera keeps
+            # looking at it, other anchors need the tracking constraint)
+            self.track.target = anchor
+            self.track.mute = anchor is None
+        else:
+            self.camera.parent = None
+            self.track.mute = True
+        self.camera.matrix_basis = matrix
+        self.scene.camera = self.camera
+        self.spec = spec
+
+    def set_auto_anchor(self, auto_anchor_location):
+        # (next model of a batch export: force the camera update)
+        self.auto_anchor_location = Vector(auto_anchor_location)
+        self.spec = None
+
+    def setup_turnaround(self, length):
+        # (the pivot and its rotation action are created once, and only
+        # their keyframes are updated afterwards)
+        if self.pivot is None:
+            self.pivot = bpy.data.objects.new('MVE_CameraPivot', None)
+            self.scene.collection.objects.link(self.pivot)
+            self.pivot_action = bpy.data.actions.new(name='MVE_RotationAction')
+            self.pivot.animation_data_create()
+            self.pivot.animation_data.action = self.pivot_action
+            fcurve = self.pivot_action.fcurves.new(data_path='rotation_euler', index=2)
+            fcurve.keyframe_points.add(2)
+            for keyframe in fcurve.keyframe_points:
+                keyframe.interpolation = 'LINEAR'
+        fcurve = self.pivot_action.fcurves[0]
+        fcurve.keyframe_points.foreach_set('co', (1, 0, length, 2.0*pi))
+        fcurve.update()
+
+    def setup_spin_set(self, spec, anchor_location):
+        # (one constant keyframe per view, set in bulk)
+        angle_count, elevations = spec.orbit
+        placements = get_orbit_placements(angle_count, elevations, 3 * spec.distance)
+        count = len(placements)
+        if self.spin_pivot is None:
+            self.spin_pivot = bpy.data.objects.new('MVE_SpinSetPivot', None)
+            self.scene.collection.objects.link(self.spin_pivot)
+            self.camera.animation_data_create()
+        if self.spin_action is not None and len(self.spin_action.fcurves[0].keyframe_points) != count:
+            bpy.data.actions.remove(self.spin_action)
+            self.spin_action = None
+        if self.spin_action is None:
+            self.spin_action = bpy.data.actions.new(name='MVE_SpinSetAction')
+            for data_path in ('location', 'rotation_euler'):
+                for index in range(3):
+                    fcurve = self.spin_action.fcurves.new(data_path=data_path, index=index)
+                    fcurve.keyframe_points.add(count)
+        self.spin_pivot.location = anchor_location
+        co = np.empty((count, 2), dtype=np.float32)
+        co[:, 0] = np.arange(1, count + 1)
+        # (0 is the CONSTANT interpolation)
+        interpolations = np.zeros(count, dtype=np.int32)
+        for i, fcurve in enumerate(self.spin_action.fcurves):
+            co[:, 1] = placements[:, i]
+            fcurve.keyframe_points.foreach_set('co', co.ravel())
+            fcurve.keyframe_points.foreach_set('interpolation', interpolations)
+            fcurve.update()
+
+    def remove(self):
+        camera_data = self.camera.data
+        bpy.data.objects.remove(self.camera)
+        bpy.data.cameras.remove(camera_data)
+        if self.pivot is not None:
+            bpy.data.objects.remove(self.pivot)
+            bpy.data.actions.remove(self.pivot_action)
+        if self.spin_pivot is not None:
+            bpy.data.objects.remove(self.spin_pivot)
+        if self.spin_action is not None:
+            bpy.data.actions.remove(self.spin_action)
+
+# (objects of the exported model whose wireframe is toggled, with the
+# show_wire values to restore after the export)
+WIREFRAME_OBJECTS = {}
+
+def scope_wireframes(objects):
+    restore_wireframes()
+    WIREFRAME_OBJECTS.update({ obj: obj.show_wire for obj in objects })
+
+def show_wireframes(on):
+    # (only the changed objects are tagged for an update)
+    for obj in WIREFRAME_OBJECTS:
+        if obj.show_wire != on:
+            obj.show_wire = on
+
+def restore_wireframes():
+    for obj, show_wire in WIREFRAME_OBJECTS.items():
+        if obj.show_wire != show_wire:
+            obj.show_wire = show_wire
+    WIREFRAME_OBJECTS.clear()
+
+def set_movie_format(scene, format, crf):
+    scene.render.film_transparent = False
+    if format == 'AVI JPEG':
+        scene.render.image_settings.file_format = 'AVI_JPEG'
+        return MOVIE_EXTENSIONS[format]
+
+    scene.render.image_settings.file_format = 'FFMPEG'
+    if format == 'MP4':
+        # (same codec and quality as the background encoder, not Blender's
+        # default codec for the container)
+        scene.render.ffmpeg.format = 'MPEG4'
+        scene.render.ffmpeg.codec = 'H264'
+        crf = MP4_CRF
+    elif format == 'H264':
+        scene.render.ffmpeg.format = 'MPEG4'
+        scene.render.ffmpeg.codec = 'H264'
+    elif format == 'WEBM':
+        scene.render.ffmpeg.format = 'WEBM'
+        scene.render.ffmpeg.codec = 'WEBM'
+    elif format == 'LOSSLESS':
+        scene.render.ffmpeg.format = 'MKV'
+        scene.render.ffmpeg.codec = 'FFV1'
+    if format in ('MP4', 'H264', 'WEBM'):
+        # (use the closest quality preset)
+        _, preset = min(BLENDER_CRF_PRESETS, key=lambda p: abs(p[0] - crf))
+        scene.render.ffmpeg.constant_rate_factor = preset
+    return MOVIE_EXTENSIONS[format]
+
+def find_ffmpeg(ffmpeg_path):
+    return shutil.which(bpy.path.abspath(ffmpeg_path))
+
+class EncoderPool:
+    # (bounded pool of FFmpeg processes that encode frame sequences while the
+    # next jobs render - each sequence folder is removed once encoded)
+
+    def __init__(self, ffmpeg, max_processes, blocking=False, profiler=None, on_encoded=None):
+        self.ffmpeg = ffmpeg
+        self.max_processes = max_processes
+        self.blocking = blocking
+        self.profiler = profiler
+        # (called with the output path of each clip encoded successfully)
+        self.on_encoded = on_encoded
+        self.running = []
+        self.errors = []
+
+    def submit(self, frames_pattern, start_number, fps, format, crf, output, frames_dir):
+        # (wait for a free slot)
+        self.wait(self.max_processes - 1)
+        output = bpy.path.abspath(output)
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        codec_args = [arg.format(crf=crf) for arg in FFMPEG_CODECS[format]]
+        cmd = [
+            self.ffmpeg, '-y', '-loglevel', 'error',
+            '-framerate', str(fps), '-start_number', str(start_number), '-i', frames_pattern,
+        ] + codec_args + [output]
+        process = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        self.running.append((process, output, frames_dir, time.perf_counter()))
+        if self.blocking:
+            self.wait()
+
+    def poll(self):
+        still_running = []
+        for process, output, frames_dir, start in self.running:
+            if process.poll() is None:
+                still_running.append((process, output, frames_dir, start))
+                continue
+            _, stderr = process.communicate()
+            if process.returncode != 0:
+                self.errors.append('{}: {}'.format(output, stderr.decode(errors='replace').strip()))
+            elif self.on_encoded is not None:
+                self.on_encoded(output)
+            shutil.rmtree(frames_dir, ignore_errors=True)
+            if self.profiler is not None:
+                # (encodes run outside of Blender: show them on their own track)
+                self.profiler.add_event(
+                    'encode', start, time.perf_counter(), tid=1, output=output)
+        self.running = still_running
+
+    def wait(self, max_running=0):
+        self.poll()
+        while len(self.running) > max_running:
+            time.sleep(0.05)
+            self.poll()
+
+    def close(self):
+        self.wait()
+        if len(self.errors) > 0:
+            raise RuntimeError('FFmpeg failed to encode:\n' + '\n'.join(self.errors))
+
+def get_shading(space3d):
+    # (headless exports have no 3D view: use the scene display settings)
+    if space3d is None:
+        return bpy.context.scene.display.shading
+    return space3d.shading
+
+def render_opengl(space3d, animation=False):
+    # (headless exports render through the scene camera)
+    bpy.ops.render.opengl(
+        write_still=True, view_context=space3d is not None, animation=animation)
+
+def export_pov(space3d, job, settings, encoder=None, writer=None):
+    scene = bpy.context.scene
+    shading = get_shading(space3d)
+
+    scene.render.resolution_x = settings['export_resolution'][0]
+    scene.render.resolution_y = settings['export_resolution'][1]
+    
+    shading.type = 'SOLID'
+    if not settings['bg_is_transparent']:
+        shading.background_color = settings['bg_color']
+    if job.wireframe:
+        show_wireframes(True)
+    
+    if job.kind == 'still':
+        scene.render.image_settings.file_format = settings['export_img_format']
+        scene.render.image_settings.compression = settings['png_compression']
+        scene.render.filepath = job.path
+        
+        if settings['bg_is_transparent']:
+            scene.render.film_transparent = True
+            scene.render.image_settings.color_mode = 'RGBA'
+        else:
+            scene.render.film_transparent = False
+            scene.render.image_settings.color_mode = 'RGB'
+        if writer is not None:
+            export_still_in_background(space3d, job, settings, writer)
+        elif len(job.sizes) == 0:
+            render_opengl(space3d)
+        else:
+            export_still_sizes(space3d, job, settings)
+    # (animations and turnarounds)
+    else:
+        scene.frame_start = job.frames[0]
+        scene.frame_end = job.frames[1]
+
+        if encoder is None:
+            set_movie_format(scene, settings['export_movie_format'], settings['movie_crf'])
+            scene.render.filepath = job.path
+            render_opengl(space3d, animation=True)
+        # (render a frame sequence and let the encoder pool make the clip)
+        else:
+            scene.render.film_transparent = False
+            scene.render.image_settings.file_format = 'PNG'
+            scene.render.image_settings.color_mode = 'RGB'
+            frames_dir = tempfile.mkdtemp(prefix='mve_frames_')
+            try:
+                scene.render.filepath = os.path.join(frames_dir, '######')
+                render_opengl(space3d, animation=True)
+                encoder.submit(
+                    os.path.join(frames_dir, '%06d.png'), job.frames[0], get_fps(scene),
+                    settings['export_movie_format'], settings['movie_crf'], job.path, frames_dir)
+            except BaseException:
+                shutil.rmtree(frames_dir, ignore_errors=True)
+                raise
+
+    if job.wireframe:
+        show_wireframes(False)
+
+
+def export_spin_set(space3d, job, settings):
+    # (all the views are rendered in one animation pass of the camera rig,
+    # as numbered images next to the JSON manifest)
+    scene = bpy.context.scene
+    shading = get_shading(space3d)
+
+    scene.render.resolution_x = settings['export_resolution'][0]
+    scene.render.resolution_y = settings['export_resolution'][1]
+    scene.render.image_settings.file_format = settings['export_img_format']
+    scene.render.film_transparent = settings['bg_is_transparent']
+    scene.render.image_settings.color_mode = 'RGBA' if settings['bg_is_transparent'] else 'RGB'
+    shading.type = 'SOLID'
+    if not settings['bg_is_transparent']:
+        shading.background_color = settings['bg_color']
+    if job.wireframe:
+        show_wireframes(True)
+
+    root = os.path.splitext(job.path)[0]
+    scene.frame_start = job.frames[0]
+    scene.frame_end = job.frames[1]
+    scene.render.filepath = root + '_####'
+    render_opengl(space3d, animation=True)
+
+    if job.wireframe:
+        show_wireframes(False)
+
+    # (the manifest is written last: it tells that the spin set is complete)
+    angle_count, elevations = job.camera.orbit
+    ext = '.{}'.format(settings['export_img_format'].lower())
+    images = []
+    for frame in range(job.frames[0], job.frames[1] + 1):
+        elevation, angle = divmod(frame - 1, angle_count)
+        images.append({
+            'file': '{}_{:04d}{}'.format(os.path.basename(root), frame, ext),
+            'angle': angle * 360.0 / angle_count,
+            'elevation': elevations[elevation],
+        })
+    manifest = {
+        'pov': job.pov,
+        'angles': angle_count,
+        'elevations': list(elevations),
+        'images': images,
+    }
+    with open(bpy.path.abspath(job.path), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+def read_keyframes(fcurve):
+    points = fcurve.keyframe_points
+    arrays = []
+    for attr in ('co', 'handle_left', 'handle_right'):
+        values = np.empty(len(points) * 2, dtype=np.float64)
+        points.foreach_get(attr, values)
+        arrays.append(values.reshape(-1, 2))
+    interpolations = np.empty(len(points), dtype=np.int32)
+    points.foreach_get('interpolation', interpolations)
+    return arrays + [interpolations]
+
+def sample_action(action, frames):
+    # (evaluate all the channels of the action for each frame of the range:
+    # the keyframes are read in bulk and interpolated with NumPy, only the
+    # frames on curved segments are evaluated by Blender)
+    start, end = frames
+    fcurves = [fcurve for fcurve in action.fcurves if not fcurve.mute]
+    samples = np.empty((len(fcurves), end - start + 1), dtype=np.float64)
+    for i, fcurve in enumerate(fcurves):
+        if len(fcurve.keyframe_points) == 0 or fcurve.extrapolation != 'CONSTANT' \
+            or len(fcurve.modifiers) > 0:
+            samples[i] = [fcurve.evaluate(frame) for frame in range(start, end + 1)]
+            continue
+        values, curved = sample_keyframes(*read_keyframes(fcurve), frames)
+        for j in np.flatnonzero(curved):
+            values[j] = fcurve.evaluate(start + j)
+        samples[i] = values
+    return samples
+
+def link_frame(source, target):
+    # (hard link when possible, else copy)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+def get_fps(scene):
+    return scene.render.fps / scene.render.fps_base
+
+def export_frames(space3d, batch, settings, encoder, rig, sources=None):
+    # (frame-major export: each frame is evaluated once and rendered for all
+    # the jobs of the batch, from their own camera, then the sequences are
+    # encoded - held frames, if any, reuse the image of their source frame)
+    scene = bpy.context.scene
+    shading = get_shading(space3d)
+
+    scene.render.resolution_x = settings['export_resolution'][0]
+    scene.render.resolution_y = settings['export_resolution'][1]
+    scene.render.image_settings.file_format = 'PNG'
+    scene.render.image_settings.color_mode = 'RGB'
+    scene.render.film_transparent = False
+    shading.type = 'SOLID'
+    if not settings['bg_is_transparent']:
+        shading.background_color = settings['bg_color']
+
+    frames_dirs = [tempfile.mkdtemp(prefix='mve_frames_') for _ in batch]
+    start, end = batch[0].frames
+    try:
+        for frame in range(start, end + 1):
+            i = frame - start
+            if sources is not None and sources[i] != i:
+                for frames_dir in frames_dirs:
+                    link_frame(
+                        os.path.join(frames_dir, '{:06d}.png'.format(start + sources[i])),
+                        os.path.join(frames_dir, '{:06d}.png'.format(frame)))
+                continue
+            scene.frame_set(frame)
+            for job, frames_dir in zip(batch, frames_dirs):
+                rig.activate(job.camera)
+                show_wireframes(job.wireframe)
+                scene.render.filepath = os.path.join(frames_dir, '{:06d}.png'.format(frame))
+                render_opengl(space3d)
+        show_wireframes(False)
+    except BaseException:
+        for frames_dir in frames_dirs:
+            shutil.rmtree(frames_dir, ignore_errors=True)
+        raise
+
+    for job, frames_dir in zip(batch, frames_dirs):
+        encoder.submit(
+            os.path.join(frames_dir, '%06d.png'), start, get_fps(scene),
+            settings['export_movie_format'], settings['movie_crf'], job.path, frames_dir)
+
+def get_3d_scene():
+    # (no screen when running in background mode)
+    if bpy.context.screen is None:
+        return None
+    for area in bpy.context.screen.areas:
+        if area.type == 'VIEW_3D':
+            return area.spaces[0]
+
+def setup_scene(space3d):
+    shading = get_shading(space3d)
+    # remember some values
+    armature = bpy.data.objects.get('Armature', None)
+    scene_parameters = {
+        'armature': armature,
+        'armature_pose_position': armature.data.pose_position if armature else '',
+        'shading_color_type': shading.color_type,
+        'bg_type': shading.background_type,
+        'bg_color': tuple(shading.background_color),
+        'frame_start': bpy.context.scene.frame_start,
+        'frame_end': bpy.context.scene.frame_end,
+        'camera': bpy.context.scene.camera,
+    }
+
+    # set viewport with user-defined background type
+    shading.background_type = 'VIEWPORT'
+    
+    # use texture coloring
+    shading.color_type = 'TEXTURE'
+    
+    # (no overlays to hide in headless mode)
+    if space3d is None:
+        return scene_parameters
+
+    # hide armature
+    space3d.show_object_viewport_armature = False
+    
+    # hide all extras/lines/grids in solid mode
+    space3d.overlay.show_floor = False
+    space3d.overlay.show_axis_x = False
+    space3d.overlay.show_axis_y = False
+    space3d.overlay.show_outline_selected = False
+    space3d.overlay.show_relationship_lines = False
+    space3d.overlay.show_extras = False
+    space3d.overlay.show_cursor = False
+    space3d.overlay.show_object_origins = False
+    space3d.overlay.show_bones = False
+    
+    return scene_parameters
+
+def reset_scene(space3d, scene_parameters):
+    shading = get_shading(space3d)
+    # restore some values
+    if scene_parameters['armature']:
+        scene_parameters['armature'].data.pose_position = scene_parameters['armature_pose_position']
+    shading.color_type = scene_parameters['shading_color_type']
+    shading.background_type = scene_parameters['bg_type']
+    shading.background_color = scene_parameters['bg_color']
+    if scene_parameters.get('simplify', None) is not None:
+        restore_scene(scene_parameters['simplify'])
+    bpy.context.scene.frame_start = scene_parameters['frame_start']
+    bpy.context.scene.frame_end = scene_parameters['frame_end']
+    bpy.context.scene.camera = scene_parameters['camera']
+    
+    restore_wireframes()
+
+    if space3d is None:
+        return
+
+    # re-enable armature
+    space3d.show_object_viewport_armature = True
+    
+    # re-enable all extras/lines/grids in solid mode
+    space3d.overlay.show_floor = True
+    space3d.overlay.show_axis_x = True
+    space3d.overlay.show_axis_y = True
+    space3d.overlay.show_outline_selected = True
+    space3d.overlay.show_relationship_lines = True
+    space3d.overlay.show_extras = True
+    space3d.overlay.show_cursor = True
+    space3d.overlay.show_object_origins = True
+    space3d.overlay.show_bones = True
+
+# == SCENE SIMPLIFICATION
+def get_object_dependencies(objects):
+    # (the objects and everything they need to be evaluated: parents,
+    # modifier and constraint targets - drivers are not followed)
+    needed = set()
+    stack = list(objects)
+    while len(stack) > 0:
+        obj = stack.pop()
+        if obj is None or obj in needed:
+            continue
+        needed.add(obj)
+        stack.append(obj.parent)
+        for modifier in obj.modifiers:
+            for attr in ('object', 'target', 'mirror_object', 'offset_object', 'start_cap', 'end_cap'):
+                target = getattr(modifier, attr, None)
+                if isinstance(target, bpy.types.Object):
+                    stack.append(target)
+        constraints = list(obj.constraints)
+        if obj.pose is not None:
+            for bone in obj.pose.bones:
+                constraints.extend(bone.constraints)
+        for constraint in constraints:
+            stack.append(getattr(constraint, 'target', None))
+            stack.append(getattr(constraint, 'pole_target', None))
+    return needed
+
+def find_layer_collection(layer_collection, name):
+    if layer_collection.collection.name == name:
+        return layer_collection
+    for child in layer_collection.children:
+        found = find_layer_collection(child, name)
+        if found is not None:
+            return found
+    return None
+
+def isolate_objects(layer_collection, needed, excluded, hidden):
+    # (exclude the collections without any needed object, and disable the
+    # other objects of the collections that are kept)
+    for child in layer_collection.children:
+        if child.exclude:
+            continue
+        if not any(obj in needed for obj in child.collection.all_objects):
+            child.exclude = True
+            excluded.append(child.collection.name)
+        else:
+            isolate_objects(child, needed, excluded, hidden)
+    for obj in layer_collection.collection.objects:
+        if obj not in needed and not obj.hide_viewport:
+            obj.hide_viewport = True
+            hidden.append(obj.name)
+
+def simplify_scene(models, settings):
+    # (returns the state to give back to restore_scene, or None)
+    if not settings['isolate_model'] and not settings['use_simplify']:
+        return None
+    scene = bpy.context.scene
+    view_layer = bpy.context.view_layer
+    state = {
+        'use_simplify': scene.render.use_simplify,
+        'simplify_subdivision': scene.render.simplify_subdivision,
+        'excluded': [],
+        'hidden': [],
+    }
+    if settings['use_simplify']:
+        scene.render.use_simplify = True
+        scene.render.simplify_subdivision = min(
+            scene.render.simplify_subdivision if state['use_simplify'] else 6,
+            settings['simplify_subdivision'])
+    if settings['isolate_model']:
+        anchors = [settings['anchor']] + [anim['anchor'] for anim in settings['animations']]
+        objects = [obj for model in models for obj in get_model_objects(model)]
+        objects += [
+            bpy.data.objects[name] for name in anchors
+            if name is not None and name in bpy.data.objects
+        ]
+        # (give back the collections and objects already hidden on error)
+        try:
+            isolate_objects(
+                view_layer.layer_collection, get_object_dependencies(objects),
+                state['excluded'], state['hidden'])
+        except BaseException:
+            restore_scene(state)
+            raise
+    return state
+
+def restore_scene(state):
+    scene = bpy.context.scene
+    scene.render.use_simplify = state['use_simplify']
+    scene.render.simplify_subdivision = state['simplify_subdivision']
+    view_layer = bpy.context.view_layer
+    for name in state['excluded']:
+        layer_collection = find_layer_collection(view_layer.layer_collection, name)
+        if layer_collection is not None:
+            layer_collection.exclude = False
+    for name in state['hidden']:
+        if name in bpy.data.objects:
+            bpy.data.objects[name].hide_viewport = False
+
+# == PROFILING
+REPORT_NAME = 'mve_report.json'
+
+class ExportProfiler:
+    # (records the duration of the export stages and jobs, for the JSON
+    # report and the Chrome trace_event file)
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.epoch = time.time()
+        self.events = []
+        self.job_times = {}
+
+    def elapsed(self):
+        return time.perf_counter() - self.origin
+
+    def add_event(self, name, start, end, tid=0, **args):
+        # (timestamps are absolute so that traces of several processes line up)
+        self.events.append({
+            'name': name,
+            'ph': 'X',
+            'pid': os.getpid(),
+            'tid': tid,
+            'ts': (self.epoch + start - self.origin) * 1e6,
+            'dur': (end - start) * 1e6,
+            'args': args,
+        })
+
+    @contextlib.contextmanager
+    def stage(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_event(name, start, time.perf_counter(), **args)
+
+    def record_batch(self, batch, wall_time):
+        for job in batch:
+            self.job_times[job.path] = wall_time / len(batch)
+
+    def get_stage_totals(self):
+        totals = {}
+        for event in self.events:
+            totals[event['name']] = totals.get(event['name'], 0) + event['dur'] / 1e6
+        return totals
+
+    def make_trace(self):
+        return { 'traceEvents': self.events, 'displayTimeUnit': 'ms' }
+
+# == EXPORT
+SETTINGS_KEYS = [
+    'base_path', 'batch_mode', 'batch_collection', 'prefix', 'anchor', 'do_wireframes', 'wireframe_suffix',
+    'export_resolution', 'extra_sizes', 'export_img_format', 'export_movie_format',
+    'movie_crf', 'sprite_sheet_max_size', 'sprite_sheet_wireframes', 'export_ortho_scale', 'bg_is_transparent', 'bg_color', 'camera_distance',
+    'turnaround_length', 'turnaround_height', 'spinset_angles', 'spinset_elevations', 'frame_major', 'multi_camera',
+    'use_export_cache', 'resume_export', 'isolate_model', 'use_simplify',
+    'simplify_subdivision', 'pose_cache', 'use_animated_framing', 'skip_held_frames', 'use_background_writer', 'writer_threads',
+    'png_compression', 'use_background_encoding', 'encoder_processes',
+    'write_export_report', 'ffmpeg_path', 'povs', 'animations', 'model',
+]
+
+def get_export_settings(scene):
+    # (snapshot the UI-set scene properties as plain Python values)
+    return {
+        'base_path': scene.base_path,
+        'batch_mode': scene.batch_mode,
+        'batch_collection': scene.batch_collection.name if scene.batch_collection else None,
+        'prefix': scene.prefix,
+        'anchor': scene.anchor.name if scene.anchor else None,
+        'do_wireframes': scene.do_wireframes,
+        'wireframe_suffix': scene.wireframe_suffix,
+        'export_resolution': tuple(scene.export_resolution),
+        'extra_sizes': parse_sizes(scene.extra_sizes),
+        'export_img_format': scene.export_img_format,
+        'export_movie_format': scene.export_movie_format,
+        'movie_crf': scene.movie_crf,
+        'sprite_sheet_max_size': scene.sprite_sheet_max_size,
+        'sprite_sheet_wireframes': scene.sprite_sheet_wireframes,
+        'export_ortho_scale': scene.export_ortho_scale,
+        'bg_is_transparent': scene.bg_is_transparent,
+        'bg_color': tuple(scene.bg_color),
+        'camera_distance': scene.camera_distance,
+        'turnaround_length': scene.turnaround_length,
+        'turnaround_height': scene.turnaround_height,
+        'spinset_angles': scene.spinset_angles,
+        'spinset_elevations': parse_elevations(scene.spinset_elevations),
+        'frame_major': scene.frame_major,
+        'multi_camera': scene.multi_camera,
+        'use_export_cache': scene.use_export_cache,
+        'resume_export': scene.resume_export,
+        'use_animated_framing': scene.use_animated_framing,
+        'skip_held_frames': scene.skip_held_frames,
+        'isolate_model': scene.isolate_model,
+        'use_simplify': scene.use_simplify,
+        'simplify_subdivision': scene.simplify_subdivision,
+        'pose_cache': scene.pose_cache,
+        'use_background_writer': scene.use_background_writer,
+        'writer_threads': scene.writer_threads,
+        'png_compression': scene.png_compression,
+        'use_background_encoding': scene.use_background_encoding,
+        'encoder_processes': scene.encoder_processes,
+        'write_export_report': scene.write_export_report,
+        'ffmpeg_path': scene.ffmpeg_path,
+        'povs': [
+            { 'name': pov.name.lower(), 'suffix': pov.suffix }
+            for pov in scene.povs if pov.enabled
+        ],
+        'animations': [
+            { 'name': anim.name, 'anchor': anim.anchor.name if anim.anchor else None }
+            for anim in scene.animations if anim.enabled and anim.name in bpy.data.actions
+        ],
+    }
+
+def normalize_povs(povs):
+    # (POVs can be given as names or as {"name", "suffix"} dicts)
+    result = []
+    for pov in povs:
+        if isinstance(pov, str):
+            pov = { 'name': pov }
+        name = pov['name'].lower()
+        if name not in POVs:
+            raise ValueError('Unknown POV "{}" (available: {})'.format(
+                name, ', '.join(POVs.keys())))
+        result.append({ 'name': name, 'suffix': pov.get('suffix', '_{}'.format(name)) })
+    return result
+
+def normalize_animations(animations):
+    # (animations can be "all", names or {"name", "anchor"} dicts)
+    if animations == 'all':
+        animations = sorted(bpy.data.actions.keys())
+    result = []
+    for anim in animations:
+        if isinstance(anim, str):
+            anim = { 'name': anim }
+        if anim['name'] not in bpy.data.actions:
+            raise ValueError('Unknown animation "{}"'.format(anim['name']))
+        result.append({ 'name': anim['name'], 'anchor': anim.get('anchor', None) })
+    return result
+
+def load_export_settings(config_path, scene):
+    # start from the scene settings and override them with the job file
+    settings = get_export_settings(scene)
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    unknown_keys = [key for key in config if key not in SETTINGS_KEYS]
+    if len(unknown_keys) > 0:
+        raise ValueError('Unknown job settings: {}'.format(', '.join(unknown_keys)))
+    settings.update(config)
+    settings['export_resolution'] = tuple(settings['export_resolution'])
+    if isinstance(settings['spinset_elevations'], str):
+        settings['spinset_elevations'] = parse_elevations(settings['spinset_elevations'])
+    if isinstance(settings['extra_sizes'], str):
+        settings['extra_sizes'] = parse_sizes(settings['extra_sizes'])
+    settings['extra_sizes'] = [tuple(size) for size in settings['extra_sizes']]
+    settings['bg_color'] = tuple(settings['bg_color'])
+    settings['povs'] = normalize_povs(settings['povs'])
+    settings['animations'] = normalize_animations(settings['animations'])
+    return settings
+
+def get_frame_ranges(model, settings):
+    # (only armatures are animated)
+    if model.type != 'ARMATURE':
+        return {}
+    frame_ranges = {}
+    bone_names = frozenset(model.data.bones.keys())
+    skipped = 0
+    for animation in settings['animations']:
+        action = bpy.data.actions[animation['name']]
+        if not is_armature_action(action, bone_names):
+            skipped += 1
+            continue
+        r = action.frame_range
+        frame_ranges[animation['name']] = (int(r.x), int(r.y) - 1)
+    # (one line per model, batch exports can have many models and actions)
+    if skipped > 0:
+        print('[MVE] Skipping {} animation(s) that do not animate the bones '
+            'of "{}"'.format(skipped, model.name))
+    return frame_ranges
+
+def plan_model_export(model, settings):
+    settings = fill_object_name(settings, model.name)
+    frame_ranges = get_frame_ranges(model, settings)
+    action_framings = None
+    if settings['use_animated_framing'] and len(frame_ranges) > 0:
+        action_framings = get_action_framings(model, frame_ranges)
+    jobs = plan_export(settings, tuple(model.dimensions), frame_ranges, action_framings)
+    return sort_jobs(dedupe_jobs(jobs))
+
+def get_auto_anchor_location(model):
+    # (the auto anchor is half-way up the model)
+    location = model.matrix_world.translation
+    return (location.x, location.y, location.z + model.dimensions.z / 2.0)
+
+def get_export_models(settings):
+    # (top-level objects only: the children of a model are exported with it)
+    if settings['batch_mode'] == 'ACTIVE':
+        model = bpy.context.view_layer.objects.active
+        return [model] if model is not None else []
+    if settings['batch_mode'] == 'SELECTED':
+        objects = set(bpy.context.selected_objects)
+    else:
+        collection = bpy.data.collections.get(settings['batch_collection'] or '', None)
+        if collection is None:
+            raise ValueError('Unknown collection "{}"'.format(settings['batch_collection']))
+        objects = set(collection.all_objects)
+    return sorted([
+        obj for obj in objects
+        if obj.parent not in objects and obj.type not in ('CAMERA', 'LIGHT')
+    ], key=lambda obj: obj.name)
+
+def plan_models_export(models, settings):
+    # (one (model, settings, jobs) plan per model, with its name in the
+    # paths - batch exports without {object} get it as prefix)
+    if len(models) > 1 and '{object}' not in settings['base_path'] + settings['prefix']:
+        prefix = '{object}'
+        if settings['prefix'] != '':
+            prefix += '_' + settings['prefix']
+        settings = dict(settings, prefix=prefix)
+    plans = []
+    for model in models:
+        model_settings = fill_object_name(settings, model.name)
+        plans.append((model, model_settings, plan_model_export(model, model_settings)))
+    return plans
+
+def get_plans_jobs(plans):
+    return [job for _, _, jobs in plans for job in jobs]
+
+def isolate_model(model, models):
+    # (hide the other models of a batch export, and return them)
+    shown = set(get_model_objects(model))
+    hidden = []
+    for other in models:
+        if other == model:
+            continue
+        for obj in get_model_objects(other):
+            if obj not in shown and obj.visible_get():
+                obj.hide_set(True)
+                hidden.append(obj)
+    return hidden
+
+def set_job_pose(model, job, armature):
+    if job.action is None:
+        if armature:
+            armature.data.pose_position = 'REST'
+        if model.type == 'ARMATURE':
+            model.data.pose_position = 'REST'
+    else:
+        model.data.pose_position = 'POSE'
+        model.animation_data.action = bpy.data.actions[job.action]
+
+def iter_export(plans, settings, space3d, profiler):
+    # (renders one batch of jobs per iteration and yields the number of
+    # frames done so far and to do - closing the generator stops the export
+    # and restores the scene; the models of the (model, settings, jobs)
+    # plans are exported in turn with the same scene setup and camera rig)
+    scene = bpy.context.scene
+    models = [model for model, _, _ in plans]
+
+    hashes = None
+    if settings['use_export_cache']:
+        hashes = {}
+        pending_plans = []
+        with profiler.stage('export_cache'):
+            for model, model_settings, jobs in plans:
+                jobs, model_hashes = get_pending_jobs(jobs, model, model_settings)
+                hashes.update(model_hashes)
+                if len(jobs) > 0:
+                    pending_plans.append((model, model_settings, jobs))
+        plans = pending_plans
+    if settings['resume_export']:
+        with profiler.stage('resume'):
+            plans = [
+                (model, model_settings, get_unfinished_jobs(jobs, model_settings))
+                for model, model_settings, jobs in plans
+            ]
+        plans = [plan for plan in plans if len(plan[2]) > 0]
+    if len(plans) == 0:
+        return
+    total_frames = plan_frame_count(get_plans_jobs(plans))
+    done_frames = 0
+
+    # (clips handed over to the encoder and images handed over to the writer
+    # are complete once encoded/written)
+    journal = JobJournal(settings)
+    encoding = {}
+    def on_output(output):
+        if output in encoding:
+            journal.done(*encoding.pop(output))
+
+    encoder = None
+    if settings['frame_major'] or settings['multi_camera'] \
+        or settings['skip_held_frames'] or settings['use_background_encoding']:
+        ffmpeg = find_ffmpeg(settings['ffmpeg_path'])
+        if ffmpeg is None:
+            print('[MVE] FFmpeg not found at "{}": rendering each clip '
+                'in a separate pass'.format(settings['ffmpeg_path']))
+        else:
+            # (without background encoding, wait for each clip to be encoded)
+            encoder = EncoderPool(
+                ffmpeg, settings['encoder_processes'],
+                blocking=not settings['use_background_encoding'], profiler=profiler,
+                on_encoded=on_output)
+    writer = None
+    if settings['use_background_writer']:
+        writer = ImageWriter(
+            settings['writer_threads'], settings['png_compression'],
+            scene.render.image_settings.quality, profiler=profiler, on_written=on_output)
+    # (frame-major clips need FFmpeg, sprite sheets are packed in memory)
+    has_encoder = encoder is not None
+    get_batch_key = lambda job: batch_key(
+        job, settings['frame_major'] and has_encoder,
+        settings['multi_camera'] and (has_encoder or job.kind == 'sheet'))
+
+    # (held poses, by action and frame range)
+    pose_sources = {}
+    # (hashes of the exported jobs, by export folder)
+    done_hashes = {}
+    hidden = []
+    pose_cache = None
+    # (the scene is set up inside the try block, so that a failing setup
+    # still restores what it changed)
+    scene_parameters = None
+    rig = None
+    try:
+        # get current scene setup
+        with profiler.stage('setup_scene'):
+            scene_parameters = setup_scene(space3d)
+            scene_parameters['simplify'] = simplify_scene(models, settings)
+
+        # deselect all to avoid overlays with wireframe
+        bpy.ops.object.select_all(action='DESELECT')
+
+        rig = CameraRig(scene, get_auto_anchor_location(plans[0][0]))
+        for model, model_settings, jobs in plans:
+            hidden = isolate_model(model, models)
+            scope_wireframes(get_model_objects(model))
+            rig.set_auto_anchor(get_auto_anchor_location(model))
+            batches = batch_jobs(jobs, get_batch_key)
+            if settings['pose_cache'] != 'NONE' and model.type == 'ARMATURE':
+                pose_cache = PoseCache(model, use_disk=settings['pose_cache'] == 'DISK')
+                # (only the actions rendered in several batches are worth baking)
+                action_batches = count_action_batches(batches)
+            for batch in batches:
+                job = batch[0]
+                batch_start = time.perf_counter()
+                show_wireframes(False)
+                # (the view may have moved between two batches of a modal export)
+                if space3d is not None:
+                    space3d.region_3d.view_perspective = 'CAMERA'
+
+                with profiler.stage('camera', pov=job.pov):
+                    rig.activate(job.camera)
+                set_job_pose(model, job, scene_parameters['armature'])
+                if pose_cache is not None:
+                    if action_batches.get(job.action, 0) > 1 and job.action not in pose_cache.poses:
+                        with profiler.stage('pose_cache', action=job.action):
+                            pose_cache.bake(job.action, job.frames)
+                    pose_cache.play(job.action)
+                sources = None
+                if settings['skip_held_frames'] and job.action is not None \
+                    and (encoder is not None or job.kind == 'sheet'):
+                    key = (job.action, job.frames)
+                    if key not in pose_sources:
+                        with profiler.stage('held_frames', action=job.action):
+                            pose_sources[key] = get_pose_sources(
+                                sample_action(bpy.data.actions[job.action], job.frames))
+                    sources = pose_sources[key]
+
+                is_encoded = encoder is not None and job.kind == 'movie' and (
+                    len(batch) > 1 or sources is not None or settings['use_background_encoding']) \
+                    or writer is not None and job.kind == 'still'
+                for batch_job in batch:
+                    journal.start(model_settings['base_path'], batch_job)
+                    if is_encoded:
+                        encoding[bpy.path.abspath(batch_job.path)] = \
+                            (model_settings['base_path'], batch_job)
+
+                with profiler.stage(
+                    'render', pov=job.pov, action=job.action, jobs=len(batch),
+                    frames=plan_frame_count(batch)):
+                    if job.kind == 'sheet':
+                        export_sprite_sheets(space3d, batch, model_settings, rig, sources)
+                    elif job.kind == 'spinset':
+                        export_spin_set(space3d, job, model_settings)
+                    elif len(batch) == 1 and sources is None:
+                        export_pov(
+                            space3d, job, model_settings,
+                            encoder if settings['use_background_encoding'] else None, writer)
+                    else:
+                        export_frames(space3d, batch, model_settings, encoder, rig, sources)
+                profiler.record_batch(batch, time.perf_counter() - batch_start)
+                if pose_cache is not None and job.action is not None:
+                    action_batches[job.action] -= 1
+                    if action_batches[job.action] == 0:
+                        pose_cache.release(job.action)
+                if not is_encoded:
+                    for batch_job in batch:
+                        journal.done(model_settings['base_path'], batch_job)
+                if hashes is not None:
+                    done_hashes.setdefault(model_settings['base_path'], {}).update({
+                        job.path: hashes[job.path] for job in batch })
+                done_frames += plan_frame_count(batch)
+                yield done_frames, total_frames
+
+            if pose_cache is not None:
+                pose_cache.close()
+                pose_cache = None
+            if model.type == 'ARMATURE':
+                model.data.pose_position = 'REST'
+            for obj in hidden:
+                obj.hide_set(False)
+            hidden = []
+    finally:
+        if pose_cache is not None:
+            pose_cache.close()
+        for model in models:
+            if model.type == 'ARMATURE':
+                model.data.pose_position = 'REST'
+        for obj in hidden:
+            obj.hide_set(False)
+        if rig is not None:
+            rig.remove()
+        # (wait for the last clips to be encoded and images to be written -
+        # their errors are raised once the scene is restored)
+        errors = []
+        try:
+            for stage, pool in (('encode_wait', encoder), ('write_wait', writer)):
+                if pool is None:
+                    continue
+                try:
+                    with profiler.stage(stage):
+                        pool.close()
+                except RuntimeError as error:
+                    errors.append(str(error))
+        finally:
+            journal.close()
+            try:
+                # (the clips and images that were not completed stay out of the cache)
+                failed = set(job.path for _, job in encoding.values())
+                for base_path, base_path_hashes in done_hashes.items():
+                    update_manifest(base_path, {
+                        path: h for path, h in base_path_hashes.items() if path not in failed })
+            finally:
+                # restore scene setup
+                if scene_parameters is not None:
+                    with profiler.stage('reset_scene'):
+                        reset_scene(space3d, scene_parameters)
+                for model in models:
+                    model.select_set(True)
+                bpy.context.view_layer.objects.active = models[0]
+        if len(errors) > 0:
+            raise RuntimeError('\n'.join(errors))
+
+def execute_plans(plans, settings, space3d=None, profiler=None):
+    if profiler is None:
+        profiler = ExportProfiler()
+    for _ in iter_export(plans, settings, space3d, profiler):
+        pass
+    return profiler
+
+def execute_plan(jobs, model, settings, space3d=None, profiler=None):
+    return execute_plans(
+        [(model, fill_object_name(settings, model.name), jobs)], settings, space3d, profiler)
+
+def export_models(models, settings, space3d=None):
+    profiler = ExportProfiler()
+    with profiler.stage('plan'):
+        plans = plan_models_export(models, settings)
+    execute_plans(plans, settings, space3d, profiler)
+    jobs = get_plans_jobs(plans)
+    if settings['write_export_report']:
+        write_export_outputs(jobs, profiler, get_report_path(settings))
+    return jobs
+
+def save_export_settings(settings, path):
+    with open(path, 'w') as f:
+        json.dump(settings, f, indent=2)
+
+def make_export_report(jobs, profiler):
+    report_jobs = []
+    for job in jobs:
+        path = bpy.path.abspath(job.path)
+        # (jobs rendered together share their batch time)
+        wall_time = profiler.job_times.get(job.path, None)
+        report_jobs.append({
+            'path': job.path,
+            'pov': job.pov,
+            'action': job.action,
+            'frames': job_frame_count(job),
+            'wireframe': job.wireframe,
+            'kind': job.kind,
+            'wall_time': wall_time,
+            'fps': job_frame_count(job) / wall_time if wall_time else None,
+            'bytes': os.path.getsize(path) if os.path.exists(path) else None,
+        })
+    return {
+        'wall_time': profiler.elapsed(),
+        'stages': profiler.get_stage_totals(),
+        'jobs': report_jobs,
+    }
+
+def get_report_path(settings):
+    # (batch exports: in the common folder of all the models)
+    base_path = settings['base_path'].split('{object}')[0]
+    return os.path.join(bpy.path.abspath(base_path), REPORT_NAME)
+
+def get_trace_path(report_path):
+    return os.path.splitext(report_path)[0] + '_trace.json'
+
+def write_export_report(report, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def write_export_outputs(jobs, profiler, report_path):
+    # (JSON report + Chrome trace_event file, next to each other)
+    write_export_report(make_export_report(jobs, profiler), report_path)
+    with open(get_trace_path(report_path), 'w') as f:
+        json.dump(profiler.make_trace(), f)
+
+# == EXPORT CACHE
+MANIFEST_NAME = 'mve_manifest.json'
+
+def hash_array(h, collection, attr, size, dtype):
+    values = np.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(attr, values)
+    h.update(values.tobytes())
+
+# (properties that only change the UI or the runtime state, not the render)
+HASH_SKIPPED_PROPERTIES = {
+    'rna_type', 'name', 'select', 'location', 'width', 'width_hidden', 'height',
+    'dimensions', 'hide', 'hide_value', 'label', 'color', 'use_custom_color',
+    'show_expanded', 'show_options', 'show_preview', 'show_texture', 'show_in_editmode',
+    'show_on_cage', 'is_active', 'active', 'tag', 'use_fake_user', 'is_override_data_local',
+    'preview_render_type', 'paint_active_slot',
+}
+
+def hash_rna_values(h, struct):
+    # (hash the editable simple properties of a struct, e.g. a modifier)
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in HASH_SKIPPED_PROPERTIES or prop.is_readonly \
+                or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, prop.identifier)
+        if prop.type == 'POINTER':
+            if not isinstance(value, bpy.types.ID):
+                continue
+            value = value.name
+        elif isinstance(value, set):
+            value = sorted(value)
+        elif prop.type in ('BOOLEAN', 'INT', 'FLOAT') and prop.array_length > 0:
+            value = np.array(value).tolist()
+        h.update(repr((prop.identifier, value)).encode())
+
+def get_model_objects(model):
+    # (the model itself, its children and the meshes deformed by it - the
+    # children are found in one pass over the scene, Object.children_recursive
+    # needs Blender 3.1)
+    children = {}
+    deformed = []
+    for obj in bpy.context.scene.objects:
+        if obj.parent is not None:
+            children.setdefault(obj.parent, []).append(obj)
+        if model.type == 'ARMATURE' and any(
+            modifier.type == 'ARMATURE' and modifier.object == model
+            for modifier in obj.modifiers):
+            deformed.append(obj)
+    objects = [model]
+    for obj in objects:
+        objects.extend(children.get(obj, []))
+    known = set(objects)
+    objects.extend(obj for obj in deformed if obj not in known)
+    return objects
+
+def get_model_meshes(model):
+    return [obj for obj in get_model_objects(model) if obj.type == 'MESH']
+
+def hash_image(h, image):
+    # (the image files are hashed by size and date, not by content)
+    h.update(repr((image.name, image.source, image.filepath, tuple(image.size))).encode())
+    if image.packed_file is not None:
+        h.update(repr(image.packed_file.size).encode())
+    else:
+        path = bpy.path.abspath(image.filepath)
+        if os.path.exists(path):
+            h.update(repr((os.path.getsize(path), os.path.getmtime(path))).encode())
+
+def hash_material(h, material):
+    # (textured solid renders show the material colors and image textures)
+    hash_rna_values(h, material)
+    if material.node_tree is None:
+        return
+    for node in material.node_tree.nodes:
+        # (the node type is readonly, so it is not hashed with the values)
+        h.update(node.bl_idname.encode())
+        hash_rna_values(h, node)
+        for socket in node.inputs:
+            hash_rna_values(h, socket)
+        if node.type == 'TEX_IMAGE' and node.image is not None:
+            hash_image(h, node.image)
+
+def hash_armature(h, obj):
+    # (rest pose, current pose of the unanimated channels and constraints)
+    bones = obj.data.bones
+    h.update(repr([(bone.name, bone.parent.name if bone.parent else None, bone.use_deform)
+        for bone in bones]).encode())
+    hash_array(h, bones, 'matrix_local', 16, np.float32)
+    pose_bones = obj.pose.bones
+    for attr, size in (('location', 3), ('rotation_quaternion', 4),
+        ('rotation_euler', 3), ('scale', 3)):
+        hash_array(h, pose_bones, attr, size, np.float32)
+    for pose_bone in pose_bones:
+        h.update(pose_bone.rotation_mode.encode())
+        for constraint in pose_bone.constraints:
+            hash_rna_values(h, constraint)
+
+def hash_model(model):
+    h = hashlib.sha1()
+    h.update(np.array(model.matrix_world, dtype=np.float64).tobytes())
+    for obj in get_model_objects(model):
+        for constraint in obj.constraints:
+            hash_rna_values(h, constraint)
+        if obj.type == 'ARMATURE':
+            hash_armature(h, obj)
+    for obj in get_model_meshes(model):
+        mesh = obj.data
+        h.update(obj.name.encode())
+        h.update(np.array(obj.matrix_world, dtype=np.float64).tobytes())
+        hash_array(h, mesh.vertices, 'co', 3, np.float32)
+        hash_array(h, mesh.loops, 'vertex_index', 1, np.int32)
+        hash_array(h, mesh.polygons, 'loop_total', 1, np.int32)
+        hash_array(h, mesh.polygons, 'material_index', 1, np.int32)
+        for material in mesh.materials:
+            h.update(repr(material.name if material else None).encode())
+            if material is not None:
+                hash_material(h, material)
+        if mesh.shape_keys is not None:
+            for key in mesh.shape_keys.key_blocks:
+                hash_array(h, key.data, 'co', 3, np.float32)
+                h.update(repr((key.name, key.value, key.mute)).encode())
+        for modifier in obj.modifiers:
+            hash_rna_values(h, modifier)
+    return h.hexdigest()
+
+def hash_action(action):
+    h = hashlib.sha1()
+    for fcurve in action.fcurves:
+        h.update(repr((fcurve.data_path, fcurve.array_index, fcurve.mute)).encode())
+        hash_array(h, fcurve.keyframe_points, 'co', 2, np.float32)
+        hash_array(h, fcurve.keyframe_points, 'handle_left', 2, np.float32)
+        hash_array(h, fcurve.keyframe_points, 'handle_right', 2, np.float32)
+        hash_array(h, fcurve.keyframe_points, 'interpolation', 1, np.int32)
+        for modifier in fcurve.modifiers:
+            hash_rna_values(h, modifier)
+    return h.hexdigest()
+
+def get_output_settings(settings):
+    # (every setting that changes the output files - the frame rate and the
+    # JPEG quality are taken from the scene render settings)
+    scene = bpy.context.scene
+    return repr(tuple(settings[key] for key in (
+        'export_resolution', 'export_img_format', 'export_movie_format', 'movie_crf',
+        'sprite_sheet_max_size', 'bg_is_transparent', 'bg_color', 'png_compression',
+        'use_simplify', 'simplify_subdivision',
+    )) + (get_fps(scene), scene.render.image_settings.quality))
+
+def compute_job_hashes(jobs, model, settings):
+    # (hash all the inputs of each job: geometry, action, camera, output settings)
+    model_hash = hash_model(model)
+    action_hashes = {}
+    output_settings = get_output_settings(settings)
+    hashes = {}
+    for job in jobs:
+        h = hashlib.sha1(model_hash.encode())
+        if job.action is not None:
+            if job.action not in action_hashes:
+                action_hashes[job.action] = hash_action(bpy.data.actions[job.action])
+            h.update(action_hashes[job.action].encode())
+        anchor_location = None
+        if job.camera.anchor is not None:
+            anchor_location = tuple(bpy.data.objects[job.camera.anchor].location)
+        h.update(repr((job, anchor_location)).encode())
+        h.update(output_settings.encode())
+        hashes[job.path] = h.hexdigest()
+    return hashes
+
+def get_manifest_path(base_path):
+    return os.path.join(bpy.path.abspath(base_path), MANIFEST_NAME)
+
+def load_manifest(base_path):
+    path = get_manifest_path(base_path)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f).get('jobs', {})
+
+def update_manifest(base_path, hashes):
+    # (re-read the manifest just before writing it, in case another export
+    # updated it in the meantime)
+    manifest = load_manifest(base_path)
+    manifest.update(hashes)
+    path = get_manifest_path(base_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # (one temp file per process, so that concurrent exports can't replace it)
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump({ 'version': 1, 'jobs': manifest }, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def get_pending_jobs(jobs, model, settings):
+    hashes = compute_job_hashes(jobs, model, settings)
+    pending_jobs = skip_unchanged_jobs(
+        jobs, hashes, load_manifest(settings['base_path']),
+        lambda path: os.path.exists(bpy.path.abspath(path)))
+    if len(pending_jobs) < len(jobs):
+        print('[MVE] Skipping {} unchanged export(s)'.format(len(jobs) - len(pending_jobs)))
+    return pending_jobs, hashes
+
+# == RESIZED STILLS
+def read_image_pixels(path):
+    image = bpy.data.images.load(path)
+    try:
+        width, height = image.size
+        pixels = np.empty(width * height * image.channels, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+    finally:
+        bpy.data.images.remove(image)
+    return pixels.reshape(height, width, -1)
+
+def write_image_pixels(pixels, path, file_format):
+    height, width, channels = pixels.shape
+    if channels < 4:
+        pixels = np.concatenate(
+            [pixels, np.ones((height, width, 4 - channels), dtype=np.float32)], axis=2)
+    image = bpy.data.images.new('MVE_Resized', width, height, alpha=True)
+    try:
+        image.pixels.foreach_set(pixels.ravel())
+        image.filepath_raw = path
+        image.file_format = file_format
+        image.save()
+    finally:
+        bpy.data.images.remove(image)
+
+def export_still_sizes(space3d, job, settings):
+    # (render once at the largest size, then resize the image in memory for
+    # the other sizes)
+    scene = bpy.context.scene
+    outputs = [(tuple(settings['export_resolution']), job.path)] + list(job.sizes)
+    render_size, render_path = max(outputs, key=lambda output: output[0][0] * output[0][1])
+    scene.render.resolution_x, scene.render.resolution_y = render_size
+    scene.render.filepath = render_path
+    render_opengl(space3d)
+
+    pixels = read_image_pixels(bpy.path.abspath(render_path))
+    for size, path in outputs:
+        if path == render_path:
+            continue
+        write_image_pixels(
+            resample_pixels(pixels, size), bpy.path.abspath(path),
+            settings['export_img_format'])
+
+# == IMAGE WRITER
+def write_image_file(pixels, path, file_format, compression, quality):
+    # (runs in a writer thread: zlib, PIL and the file writes release the GIL)
+    pixels = np.flipud(np.clip(pixels * 255 + 0.5, 0, 255).astype(np.uint8))
+    if file_format == 'PNG':
+        data = encode_png(pixels, compression)
+    else:
+        buffer = io.BytesIO()
+        Image.fromarray(np.ascontiguousarray(pixels[:, :, :3])).save(
+            buffer, 'JPEG', quality=quality)
+        data = buffer.getvalue()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # (write then rename, so that an interrupted write leaves no partial image)
+    part_path = path + '.part'
+    with open(part_path, 'wb') as f:
+        f.write(data)
+    os.replace(part_path, path)
+
+class ImageWriter:
+    # (bounded pool of threads that encode and write the still images while
+    # the next jobs render - the pixels are in Blender's order, from the bottom)
+
+    def __init__(self, max_threads, compression, quality, profiler=None, on_written=None):
+        self.executor = futures.ThreadPoolExecutor(max_workers=max_threads)
+        # (images waiting for a thread also hold their pixels in memory)
+        self.max_pending = 2 * max_threads
+        self.compression = compression
+        self.quality = quality
+        self.profiler = profiler
+        # (called with the key of each group of images once they are all
+        # written successfully)
+        self.on_written = on_written
+        self.group_sizes = {}
+        self.pending = []
+        self.errors = []
+
+    def submit(self, images, file_format, key):
+        # (a group of (pixels, path) images, e.g. the sizes of a still)
+        self.group_sizes[key] = len(images)
+        for pixels, path in images:
+            # (wait for a free slot)
+            self.wait(self.max_pending - 1)
+            start = time.perf_counter()
+            # (without PIL, Blender writes the JPEG images on the main thread)
+            if file_format == 'JPEG' and Image is None:
+                write_image_pixels(pixels, path, file_format)
+                self.written(path, key, start)
+                continue
+            future = self.executor.submit(
+                write_image_file, pixels, path, file_format, self.compression, self.quality)
+            self.pending.append((future, path, key, start))
+
+    def written(self, path, key, start):
+        self.group_sizes[key] -= 1
+        if self.group_sizes[key] == 0:
+            del self.group_sizes[key]
+            if self.on_written is not None:
+                self.on_written(key)
+        if self.profiler is not None:
+            # (writes run outside of the main thread: show them on their own track)
+            self.profiler.add_event('write', start, time.perf_counter(), tid=2, output=path)
+
+    def poll(self):
+        still_pending = []
+        for future, path, key, start in self.pending:
+            if not future.done():
+                still_pending.append((future, path, key, start))
+                continue
+            error = future.exception()
+            if error is not None:
+                self.errors.append('{}: {}'.format(path, error))
+            else:
+                self.written(path, key, start)
+        self.pending = still_pending
+
+    def wait(self, max_pending=0):
+        self.poll()
+        while len(self.pending) > max_pending:
+            futures.wait(
+                [future for future, _, _, _ in self.pending], return_when=futures.FIRST_COMPLETED)
+            self.poll()
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self.executor.shutdown()
+        if len(self.errors) > 0:
+            raise RuntimeError('Failed to write images:\n' + '\n'.join(self.errors))
+
+def export_still_in_background(space3d, job, settings, writer):
+    # (Blender can only save its renders: render the largest size to an
+    # uncompressed local file, then hand the pixels of all the sizes over
+    # to the writer threads)
+    scene = bpy.context.scene
+    outputs = [(tuple(settings['export_resolution']), job.path)] + list(job.sizes)
+    render_size = max((size for size, _ in outputs), key=lambda size: size[0] * size[1])
+    scene.render.resolution_x, scene.render.resolution_y = render_size
+    image_settings = scene.render.image_settings
+    image_settings.file_format = 'PNG'
+    image_settings.compression = 0
+    render_dir = tempfile.mkdtemp(prefix='mve_still_')
+    scene.render.filepath = os.path.join(render_dir, 'still.png')
+    try:
+        render_opengl(space3d)
+        pixels = read_image_pixels(scene.render.filepath)
+    finally:
+        shutil.rmtree(render_dir, ignore_errors=True)
+
+    channels = 4 if settings['bg_is_transparent'] else 3
+    pixels = pixels[:, :, :channels]
+    images = [
+        (pixels if size == render_size else resample_pixels(pixels, size), bpy.path.abspath(path))
+        for size, path in outputs
+    ]
+    # (the job is written once all its sizes are)
+    writer.submit(images, settings['export_img_format'], bpy.path.abspath(job.path))
+
+# == SPRITE SHEETS
+class SpriteSheet:
+    # (frames packed row by row from the top left, in one or more atlases -
+    # each atlas is allocated with its first frame, and saved and freed as
+    # soon as all its frames are packed)
+
+    def __init__(self, job, frame_count, frame_size, max_size):
+        self.job = job
+        self.frame_size = tuple(frame_size)
+        self.columns, self.rows, sheet_count = get_sheet_layout(
+            frame_count, self.frame_size, max_size)
+        per_sheet = self.columns * self.rows
+        self.counts = [min(per_sheet, frame_count - i * per_sheet) for i in range(sheet_count)]
+        self.filled = [0] * sheet_count
+        self.atlases = [None] * sheet_count
+        self.frames = [None] * frame_count
+
+    def get_cell(self, index):
+        sheet, cell = divmod(index, self.columns * self.rows)
+        row, column = divmod(cell, self.columns)
+        return sheet, column * self.frame_size[0], row * self.frame_size[1]
+
+    def add(self, index, pixels, info):
+        # (Blender images start from the bottom left - returns the packed
+        # cell, to reuse it for the held frames)
+        if pixels.shape[2] < 4:
+            pixels = np.concatenate(
+                [pixels, np.ones(pixels.shape[:2] + (4 - pixels.shape[2],), dtype=pixels.dtype)],
+                axis=2)
+        cell = np.round(np.flipud(pixels) * 255).astype(np.uint8)
+        self.put(index, cell, info)
+        return cell
+
+    def put(self, index, cell, info):
+        sheet, x, y = self.get_cell(index)
+        width, height = self.frame_size
+        if self.atlases[sheet] is None:
+            count = self.counts[sheet]
+            self.atlases[sheet] = np.zeros((
+                ceil(count / self.columns) * height, min(count, self.columns) * width, 4),
+                dtype=np.uint8)
+        self.atlases[sheet][y:y + height, x:x + width] = cell
+        self.frames[index] = dict(info, sheet=sheet, x=x, y=y, w=width, h=height)
+        self.filled[sheet] += 1
+        if self.filled[sheet] == self.counts[sheet]:
+            self.save_atlas(sheet)
+
+    def save_atlas(self, sheet):
+        write_image_pixels(
+            np.flipud(self.atlases[sheet]).astype(np.float32) / 255,
+            bpy.path.abspath(self.get_paths()[sheet]), 'PNG')
+        self.atlases[sheet] = None
+
+    def get_paths(self):
+        # (the first sheet is the job path, the next ones get a "_N" suffix)
+        root, ext = os.path.splitext(self.job.path)
+        return [self.job.path] + [
+            '{}_{}{}'.format(root, i, ext) for i in range(1, len(self.atlases))]
+
+    def save(self, fps):
+        # (the full atlases are already saved)
+        paths = self.get_paths()
+        for sheet, atlas in enumerate(self.atlases):
+            if atlas is not None:
+                self.save_atlas(sheet)
+        index = {
+            'pov': self.job.pov,
+            'action': self.job.action,
+            'fps': fps,
+            'frame_size': list(self.frame_size),
+            'sheets': [os.path.basename(path) for path in paths],
+            'frames': self.frames,
+        }
+        index_path = os.path.splitext(bpy.path.abspath(self.job.path))[0] + '.json'
+        with open(index_path, 'w') as f:
+            json.dump(index, f, indent=2)
+
+def export_sprite_sheets(space3d, batch, settings, rig, sources=None):
+    # (frame-major export to sprite sheets: each frame is evaluated once,
+    # rendered for all the jobs and passes of the batch and packed in memory -
+    # OpenGL renders can only be read back from a file, so they all go
+    # through the same scratch image)
+    scene = bpy.context.scene
+    shading = get_shading(space3d)
+
+    scene.render.resolution_x = settings['export_resolution'][0]
+    scene.render.resolution_y = settings['export_resolution'][1]
+    scene.render.image_settings.file_format = 'PNG'
+    # (the scratch image is read back right away)
+    scene.render.image_settings.compression = 0
+    scene.render.film_transparent = settings['bg_is_transparent']
+    scene.render.image_settings.color_mode = 'RGBA' if settings['bg_is_transparent'] else 'RGB'
+    shading.type = 'SOLID'
+    if not settings['bg_is_transparent']:
+        shading.background_color = settings['bg_color']
+
+    # (combined sheets hold the solid frames, then the wireframe frames)
+    start, end = batch[0].frames
+    frame_count = end - start + 1
+    sheets = []
+    layers = []
+    for job in batch:
+        passes = (False, True) if job.wireframe == 'both' else (job.wireframe,)
+        sheet = SpriteSheet(
+            job, frame_count * len(passes), settings['export_resolution'],
+            settings['sprite_sheet_max_size'])
+        sheets.append(sheet)
+        for i, wireframe in enumerate(passes):
+            layers.append((job, wireframe, sheet, i * frame_count))
+
+    tmp_dir = tempfile.mkdtemp(prefix='mve_frames_')
+    scene.render.filepath = os.path.join(tmp_dir, 'frame.png')
+    # (last packed cell of each layer: held frames repeat it)
+    cells = [None] * len(layers)
+    try:
+        for frame in range(start, end + 1):
+            i = frame - start
+            is_held = sources is not None and sources[i] != i
+            if not is_held:
+                scene.frame_set(frame)
+            for k, (job, wireframe, sheet, offset) in enumerate(layers):
+                info = { 'frame': frame, 'wireframe': wireframe }
+                if is_held:
+                    sheet.put(offset + i, cells[k], info)
+                    continue
+                rig.activate(job.camera)
+                show_wireframes(wireframe)
+                render_opengl(space3d)
+                cells[k] = sheet.add(
+                    offset + i, read_image_pixels(scene.render.filepath), info)
+        show_wireframes(False)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    fps = get_fps(scene)
+    for sheet in sheets:
+        sheet.save(fps)
+
+# == JOB JOURNAL
+JOURNAL_NAME = 'mve_journal.jsonl'
+
+def get_journal_path(base_path):
+    return os.path.join(bpy.path.abspath(base_path), JOURNAL_NAME)
+
+def get_job_key(job, output_settings):
+    return hashlib.sha1(repr((job, output_settings)).encode()).hexdigest()
+
+def get_output_size(path):
+    path = bpy.path.abspath(path)
+    return os.path.getsize(path) if os.path.exists(path) else None
+
+class JobJournal:
+    # (append-only log of the render jobs, one per export folder: a job is
+    # complete once its "done" entry is written, after its output - each
+    # entry is synced to the disk so that it survives a crash)
+
+    def __init__(self, settings):
+        self.output_settings = get_output_settings(settings)
+        self.files = {}
+
+    def write(self, base_path, event, job):
+        f = self.files.get(base_path, None)
+        if f is None:
+            path = get_journal_path(base_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = open(path, 'a')
+            self.files[base_path] = f
+        entry = {
+            'event': event,
+            'path': job.path,
+            'key': get_job_key(job, self.output_settings),
+            'time': time.time(),
+        }
+        if event == 'done':
+            entry['bytes'] = get_output_size(job.path)
+        f.write(json.dumps(entry) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+    def start(self, base_path, job):
+        self.write(base_path, 'start', job)
+
+    def done(self, base_path, job):
+        self.write(base_path, 'done', job)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+
+def load_journal(base_path):
+    # (last entry of each job - a crash can leave a truncated last line)
+    path = get_journal_path(base_path)
+    journal = {}
+    if not os.path.exists(path):
+        return journal
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            journal[entry['path']] = entry
+    return journal
+
+def get_unfinished_jobs(jobs, settings):
+    output_settings = get_output_settings(settings)
+    keys = { job.path: get_job_key(job, output_settings) for job in jobs }
+    pending_jobs = skip_completed_jobs(
+        jobs, keys, load_journal(settings['base_path']), get_output_size)
+    if len(pending_jobs) < len(jobs):
+        print('[MVE] Resuming: skipping {} completed export(s)'.format(
+            len(jobs) - len(pending_jobs)))
+    return pending_jobs
+
+# == POSE CACHE
+# (modifiers that move the vertices without changing the topology)
+DEFORM_MODIFIERS = {
+    'ARMATURE', 'CAST', 'CORRECTIVE_SMOOTH', 'CURVE', 'DISPLACE', 'HOOK',
+    'LAPLACIANDEFORM', 'LAPLACIANSMOOTH', 'LATTICE', 'MESH_DEFORM', 'SHRINKWRAP',
+    'SIMPLE_DEFORM', 'SMOOTH', 'SURFACE_DEFORM', 'WARP', 'WAVE',
+}
+
+def get_deform_stack(obj, armature):
+    # (number of modifiers up to the last armature modifier of the model, if
+    # they only deform the mesh - None if the mesh can't be cached)
+    count = None
+    for i, modifier in enumerate(obj.modifiers):
+        if modifier.type == 'ARMATURE' and modifier.object == armature and modifier.show_viewport:
+            count = i + 1
+    if count is None:
+        return None
+    if any(modifier.type not in DEFORM_MODIFIERS for modifier in obj.modifiers[:count]):
+        return None
+    # (absolute shape keys are evaluated from their own time)
+    keys = obj.data.shape_keys
+    if keys is not None and not keys.use_relative:
+        return None
+    return count
+
+# (temporary shape key that gets the cached positions while a pose plays)
+POSE_CACHE_KEY = 'MVE_PoseCache'
+
+class PoseCache:
+    # (deformed vertex positions of the model meshes, baked once per action:
+    # while an action plays from the cache, the deform modifiers and the other
+    # shape keys are disabled and the positions of each frame are written in a
+    # temporary shape key, so the mesh itself is never changed - the later
+    # modifiers, like subdivisions, still apply)
+
+    def __init__(self, model, use_disk=False):
+        self.model = model
+        self.meshes = []
+        for obj in get_model_meshes(model):
+            count = get_deform_stack(obj, model)
+            if count is not None:
+                self.meshes.append((obj, count))
+        self.tmp_dir = tempfile.mkdtemp(prefix='mve_poses_') if use_disk else None
+        # (start frame and per-mesh (frames, vertices * 3) arrays, by action)
+        self.poses = {}
+        self.playing = None
+        self.handler = lambda scene, *args: self.set_frame(scene.frame_current)
+        # (the meshes and modifiers are restored while the file is saved)
+        self.save_pre_handler = lambda *args: self.restore(self.playing[1])
+        self.save_post_handler = lambda *args: self.resume()
+
+    def bake(self, action_name, frames):
+        # (the rig must deform the meshes again)
+        self.stop()
+        scene = bpy.context.scene
+        start, end = frames
+        arrays = []
+        for i, (obj, _) in enumerate(self.meshes):
+            shape = (end - start + 1, len(obj.data.vertices) * 3)
+            if self.tmp_dir is None:
+                arrays.append(np.empty(shape, dtype=np.float32))
+            else:
+                path = os.path.join(self.tmp_dir, '{}_{}.f32'.format(len(self.poses), i))
+                arrays.append(np.memmap(path, dtype=np.float32, mode='w+', shape=shape))
+
+        # (capture the positions before the modifiers that follow the deform)
+        disabled = []
+        for obj, count in self.meshes:
+            for modifier in obj.modifiers[count:]:
+                if modifier.show_viewport:
+                    modifier.show_viewport = False
+                    disabled.append(modifier)
+        frame_current = scene.frame_current
+        self.model.data.pose_position = 'POSE'
+        self.model.animation_data.action = bpy.data.actions[action_name]
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        try:
+            for i, frame in enumerate(range(start, end + 1)):
+                scene.frame_set(frame)
+                for (obj, _), array in zip(self.meshes, arrays):
+                    evaluated = obj.evaluated_get(depsgraph)
+                    evaluated.to_mesh().vertices.foreach_get('co', array[i])
+                    evaluated.to_mesh_clear()
+        finally:
+            for modifier in disabled:
+                modifier.show_viewport = True
+            scene.frame_set(frame_current)
+        self.poses[action_name] = (start, arrays)
+
+    def play(self, action_name):
+        # (None, or an action that is not baked, goes back to the rig)
+        if self.playing is not None and self.playing[0] == action_name:
+            return
+        self.stop()
+        if action_name not in self.poses:
+            return
+        self.playing = (action_name, self.apply())
+        self.set_frame(bpy.context.scene.frame_current)
+        # (also follows the frames of the animation renders)
+        bpy.app.handlers.frame_change_pre.append(self.handler)
+        bpy.app.handlers.save_pre.append(self.save_pre_handler)
+        bpy.app.handlers.save_post.append(self.save_post_handler)
+
+    def apply(self):
+        # (disable the deformation and add the temporary shape key, fully
+        # applied on top of the basis)
+        saved = []
+        for obj, count in self.meshes:
+            modifiers = [m for m in obj.modifiers[:count] if m.show_viewport]
+            for modifier in modifiers:
+                modifier.show_viewport = False
+            has_keys = obj.data.shape_keys is not None
+            if not has_keys:
+                obj.shape_key_add(name='Basis', from_mix=False)
+            keys = obj.data.shape_keys
+            muted = [key for key in keys.key_blocks[1:] if not key.mute]
+            for key in muted:
+                key.mute = True
+            state = (has_keys, keys.use_relative, obj.show_only_shape_key,
+                obj.active_shape_key_index)
+            keys.use_relative = True
+            obj.show_only_shape_key = False
+            key = obj.shape_key_add(name=POSE_CACHE_KEY, from_mix=False)
+            key.value = 1.0
+            saved.append((obj, modifiers, muted, key, state))
+        return saved
+
+    def restore(self, saved):
+        for obj, modifiers, muted, key, state in saved:
+            has_keys, use_relative, show_only_shape_key, active_index = state
+            for muted_key in muted:
+                muted_key.mute = False
+            obj.shape_key_remove(key)
+            if has_keys:
+                obj.data.shape_keys.use_relative = use_relative
+            else:
+                # (removing the last key also removes the shape keys of the mesh)
+                obj.shape_key_remove(obj.data.shape_keys.key_blocks[0])
+            obj.show_only_shape_key = show_only_shape_key
+            obj.active_shape_key_index = active_index
+            obj.data.update()
+            for modifier in modifiers:
+                modifier.show_viewport = True
+
+    def resume(self):
+        self.playing = (self.playing[0], self.apply())
+        self.set_frame(bpy.context.scene.frame_current)
+
+    def set_frame(self, frame):
+        action_name, saved = self.playing
+        start, arrays = self.poses[action_name]
+        i = min(max(frame - start, 0), len(arrays[0]) - 1) if len(arrays) > 0 else 0
+        for (obj, _, _, key, _), array in zip(saved, arrays):
+            key.data.foreach_set('co', array[i])
+            obj.data.update()
+
+    def stop(self):
+        if self.playing is None:
+            return
+        bpy.app.handlers.frame_change_pre.remove(self.handler)
+        bpy.app.handlers.save_pre.remove(self.save_pre_handler)
+        bpy.app.handlers.save_post.remove(self.save_post_handler)
+        self.restore(self.playing[1])
+        self.playing = None
+
+    def release(self, action_name):
+        if self.playing is not None and self.playing[0] == action_name:
+            self.stop()
+        self.poses.pop(action_name, None)
+
+    def close(self):
+        self.stop()
+        self.poses = {}
+        if self.tmp_dir is not None:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+# == ANIMATED FRAMING
+# (bounds of the animated meshes, by model, action and frame range hashes)
+FRAMING_CACHE = {}
+
+def get_mesh_bounds(depsgraph, meshes):
+    # (world-space bounds of the evaluated meshes, read in bulk)
+    lows, highs = [], []
+    for obj in meshes:
+        evaluated = obj.evaluated_get(depsgraph)
+        mesh = evaluated.to_mesh()
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get('co', co)
+        evaluated.to_mesh_clear()
+        if len(co) == 0:
+            continue
+        matrix = np.array(evaluated.matrix_world, dtype=np.float32)
+        co = co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+        lows.append(co.min(axis=0))
+        highs.append(co.max(axis=0))
+    if len(lows) == 0:
+        return None
+    return np.min(lows, axis=0), np.max(highs, axis=0)
+
+def get_action_framings(model, frame_ranges):
+    # (size and center of the bounds of each action over all its frames)
+    scene = bpy.context.scene
+    meshes = get_model_meshes(model)
+    model_hash = hash_model(model)
+    framings = {}
+    to_compute = {}
+    for action_name, frames in frame_ranges.items():
+        key = (model_hash, hash_action(bpy.data.actions[action_name]), frames)
+        if key in FRAMING_CACHE:
+            framings[action_name] = FRAMING_CACHE[key]
+        else:
+            to_compute[action_name] = key
+    if len(to_compute) == 0:
+        return framings
+
+    # remember some values
+    frame_current = scene.frame_current
+    action = model.animation_data.action if model.animation_data else None
+    pose_position = model.data.pose_position
+    if model.animation_data is None:
+        model.animation_data_create()
+    model.data.pose_position = 'POSE'
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    try:
+        for action_name, key in to_compute.items():
+            model.animation_data.action = bpy.data.actions[action_name]
+            start, end = frame_ranges[action_name]
+            # (held poses have the same bounds as their first frame)
+            sources = get_pose_sources(sample_action(bpy.data.actions[action_name], (start, end)))
+            lows, highs = [], []
+            for i, frame in enumerate(range(start, end + 1)):
+                if sources[i] != i:
+                    continue
+                scene.frame_set(frame)
+                bounds = get_mesh_bounds(depsgraph, meshes)
+                if bounds is not None:
+                    lows.append(bounds[0])
+                    highs.append(bounds[1])
+            if len(lows) == 0:
+                continue
+            low, high = np.min(lows, axis=0), np.max(highs, axis=0)
+            framing = (tuple((high - low).tolist()), tuple(((high + low) / 2).tolist()))
+            FRAMING_CACHE[key] = framing
+            framings[action_name] = framing
+    finally:
+        # restore some values
+        model.animation_data.action = action
+        model.data.pose_position = pose_position
+        scene.frame_set(frame_current)
+    return framings
+
+# == ACTION INDEX
+# (bone names animated by each action, by action name - entries are dropped
+# when the action is updated and checked against its number of fcurves)
+ACTION_BONES = {}
+BONE_PATH_REGEX = re.compile(r'pose\.bones\["((?:[^"\\]|\\.)*)"\]')
+
+def get_action_bones(action):
+    entry = ACTION_BONES.get(action.name)
+    if entry is not None and entry[0] == len(action.fcurves):
+        return entry[1]
+    bones = set()
+    for fcurve in action.fcurves:
+        match = BONE_PATH_REGEX.match(fcurve.data_path)
+        if match is not None:
+            bones.add(match.group(1).replace('\\"', '"').replace('\\\\', '\\'))
+    bones = frozenset(bones)
+    ACTION_BONES[action.name] = (len(action.fcurves), bones)
+    return bones
+
+def is_armature_action(action, bone_names):
+    # (the action animates some bones, and only bones of the armature)
+    bones = get_action_bones(action)
+    return len(bones) > 0 and bones <= bone_names
+
+@bpy.app.handlers.persistent
+def update_action_index(scene, depsgraph):
+    if not depsgraph.id_type_updated('ACTION'):
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Action):
+            ACTION_BONES.pop(update.id.name, None)
+
+# == OPERATORS
+class MVEExportOperator(bpy.types.Operator):
+    
+    bl_idname = 'opr.mve_export_operator'
+    bl_label = 'MVE Export'
+    bl_description = 'Export images/clips for the 3D model (press Esc to cancel)'
+
+    is_running = False
+    
+    def execute(self, context):
+        # (blocking export, e.g. when called from a script)
+        try:
+            settings = get_export_settings(context.scene)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        models = get_export_models(settings)
+        if len(models) == 0:
+            return {'FINISHED'}
+        
+        export_models(models, settings, space3d=get_3d_scene())
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        # (non-blocking export: one batch of jobs per timer tick)
+        if MVEExportOperator.is_running:
+            self.report({'WARNING'}, 'An export is already running')
+            return {'CANCELLED'}
+        try:
+            self.settings = get_export_settings(context.scene)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        models = get_export_models(self.settings)
+        if len(models) == 0:
+            return {'FINISHED'}
+
+        self.profiler = ExportProfiler()
+        with self.profiler.stage('plan'):
+            plans = plan_models_export(models, self.settings)
+        self.jobs = get_plans_jobs(plans)
+        self.export = iter_export(plans, self.settings, get_3d_scene(), self.profiler)
+        self.start_time = time.perf_counter()
+
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+        self.timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        MVEExportOperator.is_running = True
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            # (closing the export restores the scene)
+            try:
+                self.export.close()
+            except Exception as e:
+                self.report({'ERROR'}, 'Export cancelled: {}'.format(e))
+                return {'CANCELLED'}
+            finally:
+                self.finish(context)
+            self.report({'WARNING'}, 'Export cancelled')
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            # (the pose cache changes the shape keys and modifiers while it
+            # plays: other operators would push undo steps with these changes,
+            # so they are blocked - autosaves already wait for modal operators)
+            if self.settings['pose_cache'] != 'NONE':
+                return {'RUNNING_MODAL'}
+            return {'PASS_THROUGH'}
+
+        try:
+            done_frames, total_frames = next(self.export)
+        except StopIteration:
+            self.finish(context)
+            if self.settings['write_export_report']:
+                write_export_outputs(self.jobs, self.profiler, get_report_path(self.settings))
+            self.report({'INFO'}, 'Export done in {:.0f}s'.format(self.profiler.elapsed()))
+            return {'FINISHED'}
+        except Exception as e:
+            self.finish(context)
+            self.report({'ERROR'}, 'Export failed: {}'.format(e))
+            return {'CANCELLED'}
+
+        # (show the progress and the estimated time left)
+        elapsed = time.perf_counter() - self.start_time
+        eta = elapsed / done_frames * (total_frames - done_frames)
+        context.window_manager.progress_update(int(100 * done_frames / total_frames))
+        context.workspace.status_text_set(
+            'MVE Export: {}/{} frames - {:.0f}s left (Esc to cancel)'.format(
+                done_frames, total_frames, eta))
+        return {'PASS_THROUGH'}
+
+    def cancel(self, context):
+        # (Blender dropped the modal handler, e.g. when opening another file)
+        try:
+            self.export.close()
+        finally:
+            self.finish(context)
+
+    def finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        MVEExportOperator.is_running = False
+
+class MVESelectAllPOVsOperator(bpy.types.Operator):
+    
+    bl_idname = 'opr.mve_select_all_povs_operator'
+    bl_label = 'MVE Select All POVs'
+    bl_description = 'Enable all points of views for export'
+    
+    def execute(self, context):
+        for item in context.scene.povs:
+            item.enabled = True
+        
+        return {'FINISHED'}
+
+class MVEDeselectAllPOVsOperator(bpy.types.Operator):
+    
+    bl_idname = 'opr.mve_deselect_all_povs_operator'
+    bl_label = 'MVE Deselect All POVs'
+    bl_description = 'Disable all points of views for export'
+    
+    def execute(self, context):
+        for item in context.scene.povs:
+            item.enabled = False
+        
+        return {'FINISHED'}
+
+class MVETestPOVOperator(bpy.types.Operator):
+    
+    bl_idname = 'opr.mve_test_pov_operator'
+    bl_label = 'MVE Test POV'
+    bl_description = 'Test a point of view by moving the current scene view'
+    
+    pov : bpy.props.StringProperty()
+    
+    def execute(self, context):
+        # (the view is computed like the export camera placement: no object
+        # is created and the scene is not updated)
+        model = context.active_object
+        if model is None:
+            return {'FINISHED'}
+        try:
+            settings = get_export_settings(context.scene)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        spec = make_camera_spec(self.pov, None, tuple(model.dimensions), settings)
+        anchor = context.scene.anchor
+        if anchor is not None:
+            anchor_location = anchor.location
+        else:
+            anchor_location = Vector(get_auto_anchor_location(model))
+
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                r = area.spaces.active.region_3d
+                r.view_matrix = camera_matrix(spec, anchor_location).inverted()
+                r.view_location = anchor_location
+                r.view_perspective = 'ORTHO'
+                r.view_distance = spec.ortho_scale * 1.2
+                break
+        
+        return {'FINISHED'}
+
+class MVESelectAllAnimsOperator(bpy.types.Operator):
+    
+    bl_idname = 'opr.mve_select_all_anims_operator'
+    bl_label = 'MVE Select All POVs'
+    bl_description = 'Enable all animations for export'
+    
+    def execute(self, context):
+        for item in context.scene.animations:
+            item.enabled = True
+        
+        return {'FINISHED'}
+
+class MVEDeselectAllAnimsOperator(bpy.types.Operator):
+    
+    bl_idname = 'opr.mve_deselect_all_anims_operator'
+    bl_label = 'MVE Deselect All POVs'
+    bl_description = 'Disable all animations for export'
+    
+    def execute(self, context):
+        for item in context.scene.animations:
+            item.enabled = False
+        
+        return {'FINISHED'}
+
+class MVERefreshAnimsOperator(bpy.types.Operator):
+    
+    bl_idname = 'opr.mve_refresh_anims_operator'
+    bl_label = 'MVE Refresh Animations'
+    bl_description = 'Update the list of animations with the actions of the scene'
+    
+    def execute(self, context):
+        sync_animations(context.scene)
+        
+        return {'FINISHED'}
+
+class MVEPickAnimationOperator(bpy.types.Operator):
+    
+    bl_idname = 'opr.mve_pick_animation_operator'
+    bl_label = 'MVE Pick Animation'
+    bl_description = 'See the animation on the character'
+    
+    anim_name : bpy.props.StringProperty()
+    
+    def execute(self, context):
+        if len(bpy.context.selected_objects) == 0:
+            return {'FINISHED'}
+        
+        model = bpy.context.active_object
+        if model.type != 'ARMATURE' or self.anim_name not in bpy.data.actions:
+            return {'FINISHED'}
+        
+        if model.animation_data is None:
+            model.animation_data_create()
+        model.animation_data.action = bpy.data.actions[self.anim_name]
+        
+        return {'FINISHED'}
+
+# == PANELS
+class MVE_UL_animations(bpy.types.UIList):
+    # (only the visible rows are drawn, and the list can be filtered by name;
+    # the actions that do not animate the selected armature are hidden)
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        helpers = bpy.types.UI_UL_list
+        flags = helpers.filter_items_by_name(
+            self.filter_name, self.bitflag_filter_item, items, 'name')
+        if len(flags) == 0:
+            flags = [self.bitflag_filter_item] * len(items)
+        model = context.active_object
+        if model is not None and model.type == 'ARMATURE':
+            bone_names = frozenset(model.data.bones.keys())
+            for i, item in enumerate(items):
+                action = bpy.data.actions.get(item.name)
+                if action is None or not is_armature_action(action, bone_names):
+                    # (the UI inverts the flags itself when the filter is inverted)
+                    flags[i] = self.bitflag_filter_item if self.use_filter_invert else 0
+        order = []
+        if self.use_filter_sort_alpha:
+            order = helpers.sort_items_by_name(items, 'name')
+        return flags, order
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        anim_row = layout.row()
+        anim_row.prop(item, 'enabled', text='')
+        anim_row.label(text=item.name)
+        
+        op = anim_row.operator('opr.mve_pick_animation_operator', text='', icon='HIDE_OFF')
+        op.anim_name = item.name
+        
+        extras = anim_row.row()
+        extras.enabled = item.enabled
+        extras.prop(item, 'anchor', text='')
+
+class MVEExportPanel(bpy.types.Panel):
+    
+    bl_idname = 'VIEW3D_PT_mve_export'
+    bl_label = 'Model Views Export'
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+        
+    @classmethod
+    def poll(cls, context):
+        return len(context.selected_objects) > 0
+
+    def draw(self, context):
+        col = self.layout.column()
+
+        # check for empty path
+        invalid_path = False
+        if context.scene.base_path == '':
+            col.label(text='Path cannot be empty', icon='ERROR')
+            invalid_path = True
+        
+        op_cell = col.row()
+        op_cell.enabled = not invalid_path
+        op_cell.operator('opr.mve_export_operator', text='Export')
+
+class MVEExportPanelSubpanel:
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'MVE Tab'
+
+class MVEExportPanelBaseOptions(MVEExportPanelSubpanel, bpy.types.Panel):
+    
+    bl_idname = 'VIEW3D_PT_mve_export_base_options'
+    bl_parent_id = 'VIEW3D_PT_mve_export'
+    bl_label = 'Base Options'
+
+    def draw_header(self, context):
+        layout = self.layout
+        layout.label(text='', icon='PREFERENCES')
+
+    def draw(self, context):
+        col = self.layout.column()
+        col.prop(context.scene, 'base_path', text='Path')
+        col.prop(context.scene, 'batch_mode')
+        if context.scene.batch_mode == 'COLLECTION':
+            col.prop(context.scene, 'batch_collection')
+        col.prop(context.scene, 'export_resolution')
+        col.prop(context.scene, 'extra_sizes')
+        col.prop(context.scene, 'export_img_format')
+        col.prop(context.scene, 'export_movie_format')
+        if context.scene.export_movie_format in ('H264', 'WEBM'):
+            col.prop(context.scene, 'movie_crf')
+        elif context.scene.export_movie_format == 'SPRITE_SHEET':
+            col.prop(context.scene, 'sprite_sheet_max_size')
+            sheet_wire_cell = col.row()
+            sheet_wire_cell.enabled = context.scene.do_wireframes
+            sheet_wire_cell.prop(context.scene, 'sprite_sheet_wireframes')
+        col.separator()
+        col.prop(context.scene, 'prefix')
+        col.prop(context.scene, 'anchor')
+        col.prop(context.scene, 'do_wireframes')
+        wire_suffix_cell = col.row()
+        wire_suffix_cell.enabled = context.scene.do_wireframes
+        wire_suffix_cell.prop(context.scene, 'wireframe_suffix')
+        frame_major_cell = col.row()
+        frame_major_cell.enabled = context.scene.do_wireframes
+        frame_major_cell.prop(context.scene, 'frame_major')
+        col.prop(context.scene, 'multi_camera')
+        col.prop(context.scene, 'use_export_cache')
+        col.prop(context.scene, 'resume_export')
+        col.prop(context.scene, 'skip_held_frames')
+        col.prop(context.scene, 'isolate_model')
+        col.prop(context.scene, 'use_simplify')
+        if context.scene.use_simplify:
+            col.prop(context.scene, 'simplify_subdivision')
+        col.prop(context.scene, 'pose_cache')
+        col.prop(context.scene, 'use_animated_framing')
+        col.prop(context.scene, 'write_export_report')
+        if context.scene.export_img_format == 'PNG':
+            col.prop(context.scene, 'png_compression')
+        col.prop(context.scene, 'use_background_writer')
+        if context.scene.use_background_writer:
+            col.prop(context.scene, 'writer_threads')
+        col.prop(context.scene, 'use_background_encoding')
+        if context.scene.use_background_encoding:
+            col.prop(context.scene, 'encoder_processes')
+        if context.scene.frame_major or context.scene.multi_camera \
+            or context.scene.skip_held_frames or context.scene.use_background_encoding:
+            col.prop(context.scene, 'ffmpeg_path')
+        col.separator()
+        col.prop(context.scene, 'camera_distance')
+        col.prop(context.scene, 'export_ortho_scale')
+
+class MVEExportPanelBgOptions(MVEExportPanelSubpanel, bpy.types.Panel):
+    
+    bl_idname = 'VIEW3D_PT_mve_export_bg_options'
+    bl_parent_id = 'VIEW3D_PT_mve_export'
+    bl_label = 'Background Options'
+
+    def draw_header(self, context):
+        layout = self.layout
+        layout.label(text='', icon='SCENE_DATA')
+
+    def draw(self, context):
+        col = self.layout.column()
+        bg_row = col.row()
+        bg_row.prop(context.scene, 'bg_is_transparent', text='Transparent stills')
+        bg_row.prop(context.scene, 'bg_color', text='')
+
+class MVEExportPanelPOVs(MVEExportPanelSubpanel, bpy.types.Panel):
+    
+    bl_idname = 'VIEW3D_PT_mve_export_povs'
+    bl_parent_id = 'VIEW3D_PT_mve_export'
+    bl_label = 'Points of view'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw_header(self, context):
+        layout = self.layout
+        layout.label(text='', icon='OUTLINER_OB_CAMERA')
+
+    def draw(self, context):
+        col = self.layout.column()
+        
+        btns_row = col.row()
+        btns_row.operator('opr.mve_select_all_povs_operator', text='Select All')
+        btns_row.operator('opr.mve_deselect_all_povs_operator', text='Deselect All')
+        
+        col.separator()
+        
+        for item in context.scene.povs:
+            pov_row = col.row()
+            pov_row.prop(item, 'enabled', text='')
+            pov_row.label(text=item.name)
+            
+            extras = pov_row.row()
+            extras.enabled = getattr(item, 'enabled')
+            extras.prop(item, 'suffix', text='')
+                        
+            op = pov_row.operator('opr.mve_test_pov_operator', text='', icon='HIDE_OFF')
+            op.pov = item.name.lower()
+
+            if item.name.lower() == 'turnaround' and item.enabled:
+                subcol = col.column()
+                subcol.prop(context.scene, 'turnaround_length')
+                subcol.prop(context.scene, 'turnaround_height')
+            elif item.name.lower() == 'spinset' and item.enabled:
+                subcol = col.column()
+                subcol.prop(context.scene, 'spinset_angles')
+                subcol.prop(context.scene, 'spinset_elevations')
+
+class MVEExportPanelAnimations(MVEExportPanelSubpanel, bpy.types.Panel):
+    
+    bl_idname = 'VIEW3D_PT_mve_export_animations'
+    bl_parent_id = 'VIEW3D_PT_mve_export'
+    bl_label = 'Animations'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'ARMATURE'
+
+    def draw_header(self, context):
+        layout = self.layout
+        layout.label(text='', icon='ARMATURE_DATA')
+        
+    def draw(self, context):
+        col = self.layout.column()
+        
+        btns_row = col.row()
+        btns_row.operator('opr.mve_select_all_anims_operator', text='Select All')
+        btns_row.operator('opr.mve_deselect_all_anims_operator', text='Deselect All')
+        btns_row.operator('opr.mve_refresh_anims_operator', text='', icon='FILE_REFRESH')
+        
+        col.separator()
+        
+        col.template_list(
+            'MVE_UL_animations', '', context.scene, 'animations',
+            context.scene, 'animations_index', rows=8)
+
+# == MAIN ROUTINE
+CLASSES = [
+    MVEExportOperator,
+    MVESelectAllPOVsOperator,
+    MVEDeselectAllPOVsOperator,
+    MVETestPOVOperator,
+    MVESelectAllAnimsOperator,
+    MVEDeselectAllAnimsOperator,
+    MVERefreshAnimsOperator,
+    MVEPickAnimationOperator,
+    
+    MVE_UL_animations,
+    MVEExportPanel,
+    MVEExportPanelBaseOptions,
+    MVEExportPanelBgOptions,
+    MVEExportPanelPOVs,
+    MVEExportPanelAnimations,
+]
+
+def sync_povs(scene):
+    # (only add the missing POVs, to keep the user's settings)
+    pov_names = set(pov.name.lower() for pov in scene.povs)
+    for pov_name, (_, is_enabled) in POVs.items():
+        if pov_name in pov_names:
+            continue
+        pov = scene.povs.add()
+        pov.name = pov_name.title()
+        pov.enabled = is_enabled
+        pov.suffix = '_{}'.format(pov_name)
+
+def sync_animations(scene):
+    # (only add the new actions and remove the deleted ones, to keep the
+    # user's settings - the list stays sorted by name)
+    action_names = set(bpy.data.actions.keys())
+    for i in reversed(range(len(scene.animations))):
+        if scene.animations[i].name not in action_names:
+            scene.animations.remove(i)
+    anim_names = [anim.name for anim in scene.animations]
+    for anim_name in sorted(action_names.difference(anim_names)):
+        i = bisect_left(anim_names, anim_name)
+        anim = scene.animations.add()
+        anim.name = anim_name
+        scene.animations.move(len(anim_names), i)
+        anim_names.insert(i, anim_name)
+    scene.animations_index = min(scene.animations_index, max(len(scene.animations) - 1, 0))
+
+@bpy.app.handlers.persistent
+def load_animations_and_povs(*args):
+    scene = bpy.context.scene
+    ACTION_BONES.clear()
+    sync_povs(scene)
+    sync_animations(scene)
+
+def register():
+    for (prop_name, prop_value) in PROPS:
+        setattr(bpy.types.Scene, prop_name, prop_value)
+    
+    for klass in CLASSES:
+        bpy.utils.register_class(klass)
+
+    if load_animations_and_povs not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(load_animations_and_povs)
+    if update_action_index not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(update_action_index)
+
+def unregister():
+    for (prop_name, _) in PROPS:
+        delattr(bpy.types.Scene, prop_name)
+
+    for klass in CLASSES:
+        bpy.utils.unregister_class(klass)
+    bpy.utils.unregister_class(POVProp)
+    bpy.utils.unregister_class(AnimationProp)
+
+    if load_animations_and_povs in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(load_animations_and_povs)
+    if update_action_index in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(update_action_index)
+
+
+# == PARALLEL EXPORT
+def run_sharded_export(model, settings, workers, shard_by='job', report_path=None):
+    # (split the render jobs between several background Blender instances,
+    # each working on its own copy of the current file)
+    settings = fill_object_name(settings, model.name)
+    # (workers open the file from a temp folder: make the export path absolute)
+    settings['base_path'] = bpy.path.abspath(settings['base_path'])
+    settings['model'] = model.name
+    jobs = plan_model_export(model, settings)
+    # (balance the shards on the jobs that actually need to be rendered)
+    hashes = None
+    if settings['use_export_cache']:
+        jobs, hashes = get_pending_jobs(jobs, model, settings)
+    if settings['resume_export']:
+        jobs = get_unfinished_jobs(jobs, settings)
+    shards = [shard for shard in shard_jobs(jobs, workers, by=shard_by) if len(shard) > 0]
+    if len(shards) == 0:
+        print('[MVE] Nothing to export')
+        return { 'wall_time': 0, 'workers': [], 'jobs': [], 'stages': {} }
+
+    tmp_dir = tempfile.mkdtemp(prefix='mve_')
+    settings_path = os.path.join(tmp_dir, 'settings.json')
+    # (the manifest is updated once by the coordinator, not by each worker)
+    save_export_settings(dict(settings, use_export_cache=False), settings_path)
+    # (save the current state once, then copy it for each worker)
+    blend_path = os.path.join(tmp_dir, 'worker_0.blend')
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True, relative_remap=True)
+
+    threads = max(1, (os.cpu_count() or 1) // len(shards))
+    start_time = time.time()
+    processes = []
+    for i, shard in enumerate(shards):
+        worker_blend_path = os.path.join(tmp_dir, 'worker_{}.blend'.format(i))
+        if i > 0:
+            shutil.copyfile(blend_path, worker_blend_path)
+        jobs_path = os.path.join(tmp_dir, 'worker_{}_jobs.json'.format(i))
+        with open(jobs_path, 'w') as f:
+            json.dump([job.path for job in shard], f)
+        worker_report_path = os.path.join(tmp_dir, 'worker_{}_report.json'.format(i))
+        log_path = os.path.join(tmp_dir, 'worker_{}.log'.format(i))
+        cmd = [
+            bpy.app.binary_path, '-b', worker_blend_path, '-t', str(threads),
+            '--python-exit-code', '1', '--python', os.path.abspath(__file__), '--',
+            '--config', settings_path, '--jobs', jobs_path, '--report', worker_report_path,
+        ]
+        log = open(log_path, 'w')
+        processes.append((subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT), log,
+            worker_report_path, log_path, shard))
+
+    # collect the outputs of all workers in one report
+    report = { 'wall_time': 0, 'workers': [], 'jobs': [], 'stages': {} }
+    trace_events = []
+    failed = False
+    done_hashes = {}
+    for process, log, worker_report_path, log_path, shard in processes:
+        return_code = process.wait()
+        log.close()
+        worker = {
+            'return_code': return_code,
+            'jobs': len(shard),
+            'frames': plan_frame_count(shard),
+            'log': log_path,
+        }
+        if return_code == 0 and os.path.exists(worker_report_path):
+            with open(worker_report_path, 'r') as f:
+                worker_report = json.load(f)
+            worker['wall_time'] = worker_report['wall_time']
+            report['jobs'].extend(worker_report['jobs'])
+            for stage, duration in worker_report['stages'].items():
+                report['stages'][stage] = report['stages'].get(stage, 0) + duration
+            with open(get_trace_path(worker_report_path), 'r') as f:
+                trace_events.extend(json.load(f)['traceEvents'])
+            if hashes is not None:
+                done_hashes.update({ job.path: hashes[job.path] for job in shard })
+        else:
+            failed = True
+            print('[MVE] Worker failed (exit code {}), see log: {}'.format(return_code, log_path))
+        report['workers'].append(worker)
+    report['wall_time'] = time.time() - start_time
+    if len(done_hashes) > 0:
+        update_manifest(settings['base_path'], done_hashes)
+
+    if report_path is None:
+        report_path = get_report_path(settings)
+    write_export_report(report, report_path)
+    # (each worker has its own process id in the combined trace)
+    with open(get_trace_path(report_path), 'w') as f:
+        json.dump({ 'traceEvents': trace_events, 'displayTimeUnit': 'ms' }, f)
+
+    # (keep the worker logs around if something went wrong)
+    if not failed:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return report
+
+# == COMMAND LINE
+def parse_cli_args(argv):
+    # (only keep the arguments passed to the script, after the "--" separator)
+    argv = argv[argv.index('--') + 1:] if '--' in argv else []
+    parser = argparse.ArgumentParser(
+        prog='blender -b <file.blend> --python ModelViewsExporter/__init__.py --',
+        description='Export various views of a 3D model without the Blender UI.')
+    parser.add_argument('--config', help='Path to a JSON job file with the export settings')
+    parser.add_argument('--model', help='Name of the object to export (default: active object)')
+    parser.add_argument('--output', help='Export folder (overrides the job file "base_path")')
+    parser.add_argument(
+        '--dry-run', action='store_true', help='Print the planned render jobs without exporting')
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help='Number of background Blender instances to split the export between')
+    parser.add_argument(
+        '--shard-by', choices=list(SHARD_KEYS.keys()), default='job',
+        help='How to group the render jobs when splitting them between workers')
+    parser.add_argument('--report', help='Path of the JSON export report to write')
+    parser.add_argument(
+        '--resume', action='store_true',
+        help='Skip the jobs completed by a previous, interrupted export (see the journal)')
+    parser.add_argument('--jobs', help=argparse.SUPPRESS) # (internal: worker job list)
+    return parser.parse_args(argv)
+
+def run_cli(argv):
+    args = parse_cli_args(argv)
+    scene = bpy.context.scene
+
+    # (the load_post handler did not run if the add-on was registered
+    # after the file was opened)
+    load_animations_and_povs()
+
+    if args.config:
+        settings = load_export_settings(args.config, scene)
+    else:
+        settings = get_export_settings(scene)
+    if args.output:
+        settings['base_path'] = args.output
+    if args.resume:
+        settings['resume_export'] = True
+
+    model_name = args.model or settings.get('model', None)
+    if model_name:
+        model = bpy.data.objects.get(model_name, None)
+        if model is None:
+            raise ValueError('Unknown model "{}"'.format(model_name))
+        models = [model]
+    else:
+        models = get_export_models(settings)
+        if len(models) == 0:
+            raise ValueError('No model to export: pass it with --model')
+
+    if args.dry_run:
+        print(describe_plan(get_plans_jobs(plan_models_export(models, settings))))
+        return
+
+    if args.workers > 1:
+        if len(models) > 1:
+            raise ValueError('Parallel exports only support one model at a time')
+        report = run_sharded_export(
+            models[0], settings, args.workers, shard_by=args.shard_by, report_path=args.report)
+        if any(worker['return_code'] != 0 for worker in report['workers']):
+            sys.exit(1)
+        return
+
+    profiler = ExportProfiler()
+    with profiler.stage('plan'):
+        plans = plan_models_export(models, settings)
+        if args.jobs:
+            with open(args.jobs, 'r') as f:
+                paths = json.load(f)
+            plans = [
+                (model, model_settings, select_jobs(jobs, paths))
+                for model, model_settings, jobs in plans
+            ]
+    execute_plans(plans, settings, get_3d_scene(), profiler)
+    jobs = get_plans_jobs(plans)
+    if args.report:
+        write_export_outputs(jobs, profiler, args.report)
+    elif settings['write_export_report']:
+        write_export_outputs(jobs, profiler, get_report_path(settings))
+
+
+if __name__ == '__main__':
+    register()
+    if '--' in sys.argv:
+        run_cli(sys.argv)
@@ -0,0 +1,473 @@
+"""
+[Blender and Python] Model Views Exporter - Export Plan
+
+The export planner of the Model Views Exporter addon: it turns the export
+settings into a flat list of render jobs that can be printed, counted,
+deduplicated, sharded and batched. It also holds the resizing and PNG encoding
+of the rendered images. It only works on plain Python values and numpy arrays
+(it never imports bpy), so that it can be tested outside of Blender.
+
+It is the plan module of the ModelViewsExporter add-on package.
+
+--------
+
+MIT License
+
+Copyright (c) 2022 Mina Pêcheux
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import numpy as np
+import os
+import struct
+import zlib
+from collections import namedtuple
+from math import ceil, pi
+
+# == GLOBAL VARIABLES
+MARGIN = 0.5
+POVs = {
+    # offset to anchor, enabled by default
+    'front': ((0, -1, 0), True),
+    'left': ((1, 0, 0), True),
+    'right': ((-1, 0, 0), True),
+    'top': ((0, 0, 1), True),
+    'persp': ((1, -1, 1), True),
+    'turnaround': ((0, -1, 0.2), True),
+    'back': ((0, 1, 0), False),
+    'bottom': ((0, 0, -1), False),
+    'spinset': ((0, -1, 0), False),
+}
+MOVIE_EXTENSIONS = {
+    'MP4': '.mp4',
+    'AVI JPEG': '.avi',
+    'H264': '.mp4',
+    'WEBM': '.webm',
+    'LOSSLESS': '.mkv',
+    'SPRITE_SHEET': '.png',
+}
+
+# == EXPORT PLAN
+CameraSpec = namedtuple('CameraSpec', [
+    'pov',          # name of the POV
+    'anchor',       # name of the anchor object (None: auto anchor on the model)
+    'ortho_scale',  # final orthographic scale of the camera
+    'distance',     # distance multiplier to the anchor
+    'height',       # vertical offset multiplier to the anchor
+    'length',       # number of frames of the rotation (turnaround only, else 0)
+    'target',       # location to look at with the auto anchor (None: default)
+    'orbit',        # (angle count, elevations in degrees) (spin set only, else None)
+], defaults=(None,))
+RenderJob = namedtuple('RenderJob', [
+    'path',         # output file path
+    'pov',          # name of the POV
+    'camera',       # CameraSpec to render from
+    'action',       # name of the action to apply (None: rest pose)
+    'frames',       # (start, end) inclusive frame range (None: still)
+    'wireframe',    # whether this is the wireframe pass ('both': solid and
+                    # wireframe frames in the same sprite sheet)
+    'kind',         # 'still', 'movie', 'sheet' (sprite sheet) or 'spinset'
+    'sizes',        # ((width, height), path) resized copies (stills only)
+], defaults=((),))
+SHARD_KEYS = {
+    'pov': lambda job: job.pov,
+    'action': lambda job: job.action or '',
+    'job': lambda job: job.path,
+}
+
+def make_camera_spec(pov, anchor, model_size, settings, target=None):
+    offset, _ = POVs[pov]
+    is_turnaround = pov == 'turnaround'
+    length = settings['turnaround_length'] if is_turnaround else 0
+    orbit = None
+    if pov == 'spinset':
+        orbit = (settings['spinset_angles'], tuple(settings['spinset_elevations']))
+        length = orbit[0] * len(orbit[1])
+    return CameraSpec(
+        pov=pov,
+        anchor=anchor,
+        ortho_scale=max(model_size) * (1 + MARGIN) * settings['export_ortho_scale'],
+        distance=settings['camera_distance'],
+        height=settings['turnaround_height'] if is_turnaround else offset[2],
+        length=length,
+        target=target,
+        orbit=orbit)
+
+def get_orbit_placements(angle_count, elevations, radius):
+    # (local location and XYZ euler rotation of the camera looking at the
+    # origin, for all the angles of each elevation in turn - starting from
+    # the front and turning counter-clockwise)
+    angles = -pi / 2 + np.arange(angle_count) * (2 * pi / angle_count)
+    angles, elevations = np.meshgrid(angles, np.radians(elevations))
+    angles, elevations = angles.ravel(), elevations.ravel()
+    return np.stack([
+        radius * np.cos(angles) * np.cos(elevations),
+        radius * np.sin(angles) * np.cos(elevations),
+        radius * np.sin(elevations),
+        pi / 2 - elevations,
+        np.zeros_like(angles),
+        angles + pi / 2,
+    ], axis=1)
+
+def parse_elevations(text):
+    # (degrees separated by commas or spaces)
+    try:
+        return [float(token) for token in text.replace(',', ' ').split()]
+    except ValueError:
+        raise ValueError('Invalid spin set elevations "{}"'.format(text))
+
+def fill_object_name(settings, object_name):
+    # (replace the {object} placeholder of the output paths by the model name)
+    settings = dict(settings)
+    for key in ('base_path', 'prefix'):
+        settings[key] = settings[key].replace('{object}', object_name)
+    return settings
+
+def parse_sizes(text):
+    # ("WxH" sizes separated by commas or spaces)
+    sizes = []
+    for token in text.replace(',', ' ').split():
+        try:
+            width, height = (int(x) for x in token.lower().split('x'))
+            if width <= 0 or height <= 0:
+                raise ValueError()
+        except ValueError:
+            raise ValueError('Invalid size "{}" (expected WIDTHxHEIGHT)'.format(token))
+        sizes.append((width, height))
+    return sizes
+
+def get_size_paths(path, resolution, sizes):
+    # (resized copies get a "_WxH" suffix)
+    root, ext = os.path.splitext(path)
+    size_paths = []
+    for size in sizes:
+        size = tuple(size)
+        if size == tuple(resolution) or size in dict(size_paths):
+            continue
+        size_paths.append((size, '{}_{}x{}{}'.format(root, size[0], size[1], ext)))
+    return tuple(size_paths)
+
+def make_output_path(base_path, prefix, suffix, ext, animation=None, wireframe_suffix=''):
+    if animation is None:
+        name = '{}{}'.format(prefix, suffix)
+    else:
+        s = '-' if prefix != '' else ''
+        name = '{}{}{}{}'.format(prefix, s, animation, suffix)
+    return base_path + name + wireframe_suffix + ext
+
+def plan_export(settings, model_size, frame_ranges, action_framings=None):
+    # (turn the export settings into a flat list of render jobs - animations
+    # are only planned if their frame range is given, and framed with their
+    # own (size, center) bounds if any)
+    base_path = settings['base_path']
+    # make sure the path is a folder
+    if not base_path.endswith(os.path.sep):
+        base_path += os.path.sep
+    prefix = settings['prefix']
+    img_ext = '.{}'.format(settings['export_img_format'].lower())
+    movie_ext = MOVIE_EXTENSIONS[settings['export_movie_format']]
+    movie_kind = 'sheet' if settings['export_movie_format'] == 'SPRITE_SHEET' else 'movie'
+
+    passes = [(False, '')]
+    if settings['do_wireframes']:
+        passes.append((True, settings['wireframe_suffix']))
+    movie_passes = passes
+    if movie_kind == 'sheet' and settings['do_wireframes'] and settings['sprite_sheet_wireframes']:
+        movie_passes = [('both', '')]
+
+    jobs = []
+    for pov in settings['povs']:
+        pov_name, suffix = pov['name'], pov['suffix']
+        camera = make_camera_spec(pov_name, settings['anchor'], model_size, settings)
+
+        # special case: spin set (numbered images, listed in a JSON manifest)
+        if pov_name == 'spinset':
+            for wireframe, wireframe_suffix in passes:
+                jobs.append(RenderJob(
+                    path=make_output_path(
+                        base_path, prefix, suffix, '.json',
+                        wireframe_suffix=wireframe_suffix),
+                    pov=pov_name, camera=camera, action=None,
+                    frames=(1, camera.length), wireframe=wireframe, kind='spinset'))
+            continue
+
+        # special case: turnaround
+        if pov_name == 'turnaround':
+            for wireframe, wireframe_suffix in movie_passes:
+                jobs.append(RenderJob(
+                    path=make_output_path(
+                        base_path, prefix, suffix, movie_ext,
+                        wireframe_suffix=wireframe_suffix),
+                    pov=pov_name, camera=camera, action=None,
+                    frames=(1, camera.length), wireframe=wireframe, kind=movie_kind))
+            continue
+
+        for wireframe, wireframe_suffix in passes:
+            path = make_output_path(
+                base_path, prefix, suffix, img_ext, wireframe_suffix=wireframe_suffix)
+            jobs.append(RenderJob(
+                path=path, pov=pov_name, camera=camera, action=None,
+                frames=None, wireframe=wireframe, kind='still',
+                sizes=get_size_paths(
+                    path, settings['export_resolution'], settings['extra_sizes'])))
+
+        for animation in settings['animations']:
+            anim_name = animation['name']
+            if anim_name not in frame_ranges:
+                continue
+            # (recompute anchor and framing if need be)
+            anim_camera = camera
+            if action_framings is not None and anim_name in action_framings:
+                anim_size, anim_center = action_framings[anim_name]
+                anim_camera = make_camera_spec(
+                    pov_name, animation['anchor'] or settings['anchor'], anim_size, settings,
+                    target=anim_center)
+            elif animation['anchor'] is not None:
+                anim_camera = make_camera_spec(
+                    pov_name, animation['anchor'], model_size, settings)
+            for wireframe, wireframe_suffix in movie_passes:
+                jobs.append(RenderJob(
+                    path=make_output_path(
+                        base_path, prefix, suffix, movie_ext,
+                        animation=anim_name, wireframe_suffix=wireframe_suffix),
+                    pov=pov_name, camera=anim_camera, action=anim_name,
+                    frames=frame_ranges[anim_name], wireframe=wireframe, kind=movie_kind))
+
+    return jobs
+
+def job_frame_count(job):
+    if job.frames is None:
+        return 1
+    count = job.frames[1] - job.frames[0] + 1
+    return 2 * count if job.wireframe == 'both' else count
+
+def get_sheet_layout(frame_count, frame_size, max_size):
+    # (columns and rows of frames per sprite sheet, and number of sheets)
+    width, height = frame_size
+    columns = max(1, min(frame_count, max_size // width))
+    rows = max(1, min(ceil(frame_count / columns), max_size // height))
+    return columns, rows, ceil(frame_count / (columns * rows))
+
+def plan_frame_count(jobs):
+    return sum(job_frame_count(job) for job in jobs)
+
+def dedupe_jobs(jobs):
+    # (keep the first job for each output path)
+    seen = set()
+    result = []
+    for job in jobs:
+        if job.path in seen:
+            continue
+        seen.add(job.path)
+        result.append(job)
+    return result
+
+def sort_jobs(jobs):
+    # (group the jobs by action, in the order of their first job, so that
+    # each action is posed and cached once for all the POVs and passes - the
+    # planned order is kept inside each group)
+    order = {}
+    for job in jobs:
+        order.setdefault(job.action, len(order))
+    return sorted(jobs, key=lambda job: order[job.action])
+
+def shard_jobs(jobs, count, by='job'):
+    # (split the jobs in "count" shards with a similar number of frames,
+    # keeping together all the jobs with the same POV/action/path)
+    if by not in SHARD_KEYS:
+        raise ValueError('Unknown shard key "{}" (available: {})'.format(
+            by, ', '.join(SHARD_KEYS.keys())))
+    groups = {}
+    for job in jobs:
+        groups.setdefault(SHARD_KEYS[by](job), []).append(job)
+    shards = [[] for _ in range(count)]
+    loads = [0] * count
+    # (largest groups first, each one on the least loaded shard)
+    for group in sorted(groups.values(), key=plan_frame_count, reverse=True):
+        i = loads.index(min(loads))
+        shards[i].extend(group)
+        loads[i] += plan_frame_count(group)
+    # (restore the planned order inside each shard)
+    order = { job: i for i, job in enumerate(jobs) }
+    return [sorted(shard, key=order.get) for shard in shards]
+
+def batch_key(job, frame_major, multi_camera):
+    # (clips sharing a camera, action and frame range can render together -
+    # or, in multi-camera mode, animation clips sharing an action and frame
+    # range whatever their camera)
+    if job.kind not in ('movie', 'sheet'):
+        return None
+    # (sprite sheets are always rendered frame by frame)
+    frame_major = frame_major or job.kind == 'sheet'
+    if multi_camera and job.action is not None:
+        key = (job.action, job.frames)
+    elif frame_major:
+        key = (job.camera, job.action, job.frames)
+    else:
+        return None
+    # (without frame-major, solid and wireframe passes stay separate)
+    if not frame_major:
+        key += (job.wireframe,)
+    return key
+
+def batch_jobs(jobs, key):
+    # (group the jobs with the same key, in the planned order - jobs with
+    # a None key stay alone)
+    batches = []
+    batch_indices = {}
+    for job in jobs:
+        k = key(job)
+        if k is None:
+            batches.append([job])
+        elif k in batch_indices:
+            batches[batch_indices[k]].append(job)
+        else:
+            batch_indices[k] = len(batches)
+            batches.append([job])
+    return batches
+
+def count_action_batches(batches):
+    # (number of batches rendering each action)
+    counts = {}
+    for batch in batches:
+        action = batch[0].action
+        if action is not None:
+            counts[action] = counts.get(action, 0) + 1
+    return counts
+
+def sample_keyframes(co, left_handles, right_handles, interpolations, frames):
+    # (values of an fcurve with constant extrapolation at the integer frames
+    # of the range, from its (keys, 2) points and handles and its (keys,)
+    # interpolations - 0 is CONSTANT, 1 LINEAR - also returns the mask of the
+    # frames on curved segments, that need a full evaluation)
+    start, end = frames
+    x = np.arange(start, end + 1, dtype=np.float64)
+    keys_x, keys_y = co[:, 0], co[:, 1]
+    # (key at or before each frame, and the next one)
+    i = np.searchsorted(keys_x, x, side='right') - 1
+    before = i < 0
+    i0 = np.maximum(i, 0)
+    i1 = np.minimum(i0 + 1, len(keys_x) - 1)
+    after = i0 == i1
+    x0, x1, y0, y1 = keys_x[i0], keys_x[i1], keys_y[i0], keys_y[i1]
+    span = np.where(x1 > x0, x1 - x0, 1)
+    t = np.clip((x - x0) / span, 0, 1)
+    interpolation = interpolations[i0]
+    values = np.where(interpolation == 1, y0 + t * (y1 - y0), y0)
+    values[before] = keys_y[0]
+    # (curved segments are flat if both keys and the handles between them
+    # have the same value)
+    flat = (y1 == y0) & (right_handles[i0, 1] == y0) & (left_handles[i1, 1] == y0)
+    curved = (interpolation > 1) & ~flat & (x != x0) & ~before & ~after
+    return values, curved
+
+def get_pose_sources(samples, tolerance=1e-5):
+    # (samples: channels x frames array of the animation values - returns,
+    # for each frame, the index of the first frame of its run of identical
+    # poses)
+    frame_count = samples.shape[1]
+    changed = np.ones(frame_count, dtype=bool)
+    changed[1:] = np.any(np.abs(np.diff(samples, axis=1)) > tolerance, axis=0)
+    indices = np.arange(frame_count)
+    return np.maximum.accumulate(np.where(changed, indices, 0))
+
+def skip_unchanged_jobs(jobs, hashes, manifest, output_exists):
+    # (a job can be skipped if its inputs hash is the one recorded in the
+    # manifest and its output is still there)
+    return [
+        job for job in jobs
+        if manifest.get(job.path, None) != hashes[job.path] or not output_exists(job.path)
+    ]
+
+def skip_completed_jobs(jobs, keys, journal, output_size):
+    # (a job can be skipped if its last journal entry says it was completed
+    # with the same inputs, and its output still has the recorded size)
+    pending_jobs = []
+    for job in jobs:
+        entry = journal.get(job.path, None)
+        if entry is None or entry['event'] != 'done' or entry['key'] != keys[job.path] \
+            or entry['bytes'] is None or output_size(job.path) != entry['bytes']:
+            pending_jobs.append(job)
+    return pending_jobs
+
+def select_jobs(jobs, paths):
+    # (keep the jobs with the given output paths, in the planned order)
+    paths = set(paths)
+    return [job for job in jobs if job.path in paths]
+
+def describe_plan(jobs):
+    lines = []
+    for job in jobs:
+        frames = '-' if job.frames is None else '{}-{}'.format(*job.frames)
+        lines.append('{:<6} {:<12} {:<24} {:>11} {:<5} {}'.format(
+            job.kind, job.pov, job.action or '-', frames,
+            'both' if job.wireframe == 'both' else 'wire' if job.wireframe else 'solid',
+            job.path))
+    lines.append('{} job(s), {} frame(s)'.format(len(jobs), plan_frame_count(jobs)))
+    return '\n'.join(lines)
+
+# == IMAGE PROCESSING
+def crop_to_aspect(pixels, size):
+    # (center crop of a (height, width, channels) array to the aspect ratio of size)
+    height, width = pixels.shape[:2]
+    target_width, target_height = size
+    if width * target_height > height * target_width:
+        crop = int(round(height * target_width / target_height))
+        x = (width - crop) // 2
+        return pixels[:, x:x + crop]
+    crop = int(round(width * target_height / target_width))
+    y = (height - crop) // 2
+    return pixels[y:y + crop]
+
+def resample_axis(pixels, count, axis):
+    # (area average: each output pixel is the mean of the input pixels it
+    # covers, computed from the cumulative sums at the pixel edges)
+    n = pixels.shape[axis]
+    shape = list(pixels.shape)
+    shape[axis] = 1
+    sums = np.concatenate(
+        [np.zeros(shape, dtype=np.float32), np.cumsum(pixels, axis=axis, dtype=np.float32)],
+        axis=axis)
+    edges = np.linspace(0, n, count + 1)
+    indices = np.floor(edges).astype(int)
+    fractions = (edges - indices).reshape([-1 if a == axis else 1 for a in range(pixels.ndim)])
+    # (the last edge has no fraction: clamp its index to read a valid pixel)
+    at_edges = np.take(sums, indices, axis=axis) \
+        + fractions * np.take(pixels, np.minimum(indices, n - 1), axis=axis)
+    return np.diff(at_edges, axis=axis) * np.float32(count / n)
+
+def resample_pixels(pixels, size):
+    width, height = size
+    pixels = crop_to_aspect(pixels, size)
+    return resample_axis(resample_axis(pixels, height, 0), width, 1).astype(np.float32)
+
+def encode_png(pixels, compression):
+    # (8-bit RGB/RGBA image, rows from the top, without filtering)
+    height, width, channels = pixels.shape
+    rows = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    rows[:, 1:] = pixels.reshape(height, -1)
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data \
+            + struct.pack('>I', zlib.crc32(tag + data))
+    header = struct.pack('>IIBBBBB', width, height, 8, 6 if channels == 4 else 2, 0, 0, 0)
+    # (the compression is a percentage, like in Blender)
+    level = int(round(compression * 9 / 100))
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) \
+        + chunk(b'IDAT', zlib.compress(rows.tobytes(), level)) + chunk(b'IEND', b'')
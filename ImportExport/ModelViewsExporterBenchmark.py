@@ -0,0 +1,264 @@
+"""
+[Blender and Python] Model Views Exporter - Benchmark
+
+A headless benchmark for the Model Views Exporter addon: it generates a
+synthetic rigged and animated model with a given size, runs the export
+pipeline on it and appends the throughput, peak memory and per-stage timings
+to a results file, so that they can be compared across commits.
+
+Usage (from this folder):
+
+    blender -b --factory-startup --python ModelViewsExporterBenchmark.py -- \
+        --vertices 100000 --bones 50 --actions 4 --frames 120
+
+--------
+
+MIT License
+
+Copyright (c) 2022 Mina Pêcheux
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import bpy
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from math import ceil, sqrt
+
+try:
+    import resource
+except ImportError:
+    # (not available on Windows)
+    resource = None
+
+# (the exporter package is imported from the same folder)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+MODEL_HEIGHT = 2.0
+
+# == SYNTHETIC SCENE
+def make_mesh(vertex_count):
+    # (vertical grid of roughly "vertex_count" vertices)
+    n = max(2, int(ceil(sqrt(vertex_count))))
+    xs, zs = np.meshgrid(np.linspace(-0.5, 0.5, n), np.linspace(0, MODEL_HEIGHT, n))
+    co = np.stack([xs.ravel(), np.zeros(n * n), zs.ravel()], axis=1)
+    i = np.arange(n - 1)
+    rows, cols = np.meshgrid(i, i, indexing='ij')
+    a = (rows * n + cols).ravel()
+    faces = np.stack([a, a + 1, a + n + 1, a + n], axis=1)
+
+    mesh = bpy.data.meshes.new('BenchmarkMesh')
+    mesh.from_pydata(co.tolist(), [], faces.tolist())
+    mesh.update()
+    obj = bpy.data.objects.new('BenchmarkMesh', mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+def make_armature(bone_count):
+    # (vertical chain of bones)
+    armature = bpy.data.armatures.new('BenchmarkArmature')
+    obj = bpy.data.objects.new('BenchmarkArmature', armature)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.mode_set(mode='EDIT')
+    bone_length = MODEL_HEIGHT / bone_count
+    parent = None
+    for i in range(bone_count):
+        bone = armature.edit_bones.new('Bone_{}'.format(i))
+        bone.head = (0, 0, i * bone_length)
+        bone.tail = (0, 0, (i + 1) * bone_length)
+        bone.parent = parent
+        bone.use_connect = parent is not None
+        parent = bone
+    bpy.ops.object.mode_set(mode='OBJECT')
+    for pose_bone in obj.pose.bones:
+        pose_bone.rotation_mode = 'XYZ'
+    return obj
+
+def skin_mesh(mesh_obj, armature_obj, bone_count):
+    # (each vertex follows the bone at its height)
+    co = np.empty(len(mesh_obj.data.vertices) * 3, dtype=np.float32)
+    mesh_obj.data.vertices.foreach_get('co', co)
+    bone_indices = np.minimum(
+        (co[2::3] / MODEL_HEIGHT * bone_count).astype(int), bone_count - 1)
+    for i in range(bone_count):
+        group = mesh_obj.vertex_groups.new(name='Bone_{}'.format(i))
+        group.add(np.flatnonzero(bone_indices == i).tolist(), 1.0, 'REPLACE')
+    modifier = mesh_obj.modifiers.new('Armature', 'ARMATURE')
+    modifier.object = armature_obj
+    mesh_obj.parent = armature_obj
+
+def make_actions(armature_obj, bone_count, action_count, frame_count):
+    # (sine waves on all the bones, with a key every 10 frames)
+    armature_obj.animation_data_create()
+    key_frames = np.unique(np.append(np.arange(1, frame_count + 1, 10), frame_count + 1))
+    for a in range(action_count):
+        action = bpy.data.actions.new('BenchmarkAction_{}'.format(a))
+        for i in range(bone_count):
+            fcurve = action.fcurves.new(
+                data_path='pose.bones["Bone_{}"].rotation_euler'.format(i), index=0)
+            values = 0.3 * np.sin(key_frames / frame_count * 2 * np.pi * (a + 1) + i)
+            fcurve.keyframe_points.add(len(key_frames))
+            fcurve.keyframe_points.foreach_set(
+                'co', np.stack([key_frames, values], axis=1).ravel())
+            fcurve.update()
+    armature_obj.animation_data.action = bpy.data.actions['BenchmarkAction_0']
+
+def make_scene(vertex_count, bone_count, action_count, frame_count):
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    mesh_obj = make_mesh(vertex_count)
+    armature_obj = make_armature(bone_count)
+    skin_mesh(mesh_obj, armature_obj, bone_count)
+    make_actions(armature_obj, bone_count, action_count, frame_count)
+    return armature_obj
+
+# == BENCHMARK
+def get_peak_rss():
+    # (in bytes - ru_maxrss is in kilobytes on Linux, bytes on macOS)
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def get_git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(args):
+    scene_params = {
+        'vertices': args.vertices,
+        'bones': args.bones,
+        'actions': args.actions,
+        'frames': args.frames,
+    }
+    start = time.perf_counter()
+    model = make_scene(args.vertices, args.bones, args.actions, args.frames)
+    scene_time = time.perf_counter() - start
+
+    import ModelViewsExporter as mve
+    mve.register()
+    mve.load_animations_and_povs()
+
+    scene = bpy.context.scene
+    output_dir = tempfile.mkdtemp(prefix='mve_benchmark_')
+    settings = mve.get_export_settings(scene)
+    settings.update({
+        'base_path': output_dir,
+        'export_resolution': tuple(args.resolution),
+        'povs': mve.normalize_povs(args.povs),
+        'animations': mve.normalize_animations('all'),
+    })
+    # (exporter options to benchmark, e.g. frame_major=true)
+    for option in args.set:
+        key, value = option.split('=', 1)
+        if key not in settings:
+            raise ValueError('Unknown export setting "{}"'.format(key))
+        settings[key] = json.loads(value)
+
+    try:
+        profiler = mve.ExportProfiler()
+        with profiler.stage('plan'):
+            jobs = mve.plan_model_export(model, settings)
+        mve.execute_plan(jobs, model, settings, mve.get_3d_scene(), profiler)
+        report = mve.make_export_report(jobs, profiler)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    frame_count = mve.plan_frame_count(jobs)
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': get_git_commit(),
+        'blender': bpy.app.version_string,
+        'scene': scene_params,
+        'options': args.set,
+        'povs': args.povs,
+        'resolution': args.resolution,
+        'scene_time': scene_time,
+        'wall_time': report['wall_time'],
+        'jobs': len(jobs),
+        'frames': frame_count,
+        'fps': frame_count / report['wall_time'],
+        'peak_rss': get_peak_rss(),
+        'stages': report['stages'],
+    }
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def print_result(result, previous):
+    print('[MVE Benchmark] {} jobs, {} frames in {:.2f}s: {:.2f} fps, peak RSS {}'.format(
+        result['jobs'], result['frames'], result['wall_time'], result['fps'],
+        '{:.0f} MB'.format(result['peak_rss'] / 1e6) if result['peak_rss'] else 'n/a'))
+    for stage, duration in sorted(result['stages'].items(), key=lambda s: -s[1]):
+        print('    {:<16} {:>8.2f}s'.format(stage, duration))
+    if previous is not None:
+        print('[MVE Benchmark] vs. {} ({}): {:+.1f}% fps'.format(
+            previous['commit'], previous['time'],
+            100.0 * (result['fps'] / previous['fps'] - 1)))
+
+def main(argv):
+    argv = argv[argv.index('--') + 1:] if '--' in argv else []
+    parser = argparse.ArgumentParser(
+        prog='blender -b --factory-startup --python ModelViewsExporterBenchmark.py --',
+        description='Benchmark the Model Views Exporter on a synthetic scene.')
+    parser.add_argument('--vertices', type=int, default=10000, help='Number of vertices of the mesh')
+    parser.add_argument('--bones', type=int, default=20, help='Number of bones of the armature')
+    parser.add_argument('--actions', type=int, default=2, help='Number of actions')
+    parser.add_argument('--frames', type=int, default=60, help='Number of frames of each action')
+    parser.add_argument(
+        '--povs', nargs='+', default=['front', 'persp'], help='Points of view to export')
+    parser.add_argument(
+        '--resolution', type=int, nargs=2, default=[640, 360], help='Export resolution')
+    parser.add_argument(
+        '--set', action='append', default=[], metavar='KEY=JSON',
+        help='Override an export setting (can be repeated)')
+    parser.add_argument(
+        '--results', default='mve_benchmark.jsonl',
+        help='Results file to append to (one JSON object per line)')
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args)
+
+    # (compare with the last run on the same scene and options)
+    previous = None
+    for other in load_results(args.results):
+        if all(other[key] == result[key] for key in ('scene', 'options', 'povs', 'resolution')):
+            previous = other
+    print_result(result, previous)
+    with open(args.results, 'a') as f:
+        f.write(json.dumps(result) + '\n')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
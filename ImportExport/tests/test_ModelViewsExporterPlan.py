@@ -0,0 +1,272 @@
+"""
+Tests of the Model Views Exporter planner - they run without Blender:
+
+    python -m pytest ImportExport/tests
+"""
+
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+# (the plan module is imported on its own: the package itself needs bpy)
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'ModelViewsExporter'))
+
+import plan
+
+MODEL_SIZE = (1.0, 1.0, 2.0)
+
+def make_settings(**overrides):
+    settings = {
+        'base_path': '/renders/',
+        'prefix': 'hero',
+        'anchor': None,
+        'do_wireframes': True,
+        'wireframe_suffix': '_wireframe',
+        'export_resolution': (1920, 1080),
+        'extra_sizes': [],
+        'export_img_format': 'PNG',
+        'export_movie_format': 'MP4',
+        'sprite_sheet_wireframes': False,
+        'export_ortho_scale': 1.0,
+        'camera_distance': 1.0,
+        'turnaround_length': 160,
+        'turnaround_height': 0.2,
+        'spinset_angles': 36,
+        'spinset_elevations': [0.0],
+        'povs': [{ 'name': 'front', 'suffix': '' }, { 'name': 'persp', 'suffix': '_3q' }],
+        'animations': [{ 'name': 'Idle', 'anchor': None }, { 'name': 'Walk', 'anchor': None }],
+    }
+    settings.update(overrides)
+    return settings
+
+FRAME_RANGES = { 'Idle': (1, 40), 'Walk': (1, 24) }
+
+# == EXPORT PLAN
+def test_plan_export_stills_and_clips():
+    jobs = plan.plan_export(make_settings(), MODEL_SIZE, FRAME_RANGES)
+    # (2 POVs x (1 still + 2 actions) x 2 passes)
+    assert len(jobs) == 12
+    paths = [job.path for job in jobs]
+    assert '/renders/hero.png' in paths
+    assert '/renders/hero_wireframe.png' in paths
+    assert '/renders/hero-Walk_3q.mp4' in paths
+    assert '/renders/hero-Idle_3q_wireframe.mp4' in paths
+    walk = [job for job in jobs if job.action == 'Walk']
+    assert all(job.frames == (1, 24) and job.kind == 'movie' for job in walk)
+    assert sorted(job.wireframe for job in walk) == [False, False, True, True]
+
+def test_plan_export_skips_actions_without_frame_range():
+    jobs = plan.plan_export(make_settings(do_wireframes=False), MODEL_SIZE, { 'Idle': (1, 40) })
+    assert set(job.action for job in jobs) == { None, 'Idle' }
+
+def test_plan_export_special_povs():
+    settings = make_settings(
+        povs=[{ 'name': 'turnaround', 'suffix': '' }, { 'name': 'spinset', 'suffix': '_spin' }],
+        spinset_angles=12, spinset_elevations=[0.0, 30.0], do_wireframes=False)
+    turnaround, spinset = plan.plan_export(settings, MODEL_SIZE, FRAME_RANGES)
+    assert turnaround.kind == 'movie' and turnaround.frames == (1, 160)
+    assert spinset.kind == 'spinset' and spinset.path == '/renders/hero_spin.json'
+    assert spinset.frames == (1, 24)
+
+def test_plan_export_extra_sizes():
+    settings = make_settings(
+        do_wireframes=False, animations=[], extra_sizes=[(1920, 1080), (512, 512)])
+    still, _ = plan.plan_export(settings, MODEL_SIZE, {})
+    # (the export resolution itself is not duplicated)
+    assert still.sizes == (((512, 512), '/renders/hero_512x512.png'),)
+
+def test_plan_export_combined_sprite_sheets():
+    settings = make_settings(export_movie_format='SPRITE_SHEET', sprite_sheet_wireframes=True)
+    jobs = plan.plan_export(settings, MODEL_SIZE, FRAME_RANGES)
+    sheets = [job for job in jobs if job.kind == 'sheet']
+    assert len(sheets) == 4
+    assert all(job.wireframe == 'both' for job in sheets)
+    assert plan.job_frame_count(sheets[0]) == 2 * 40
+
+def test_plan_export_action_framings():
+    jobs = plan.plan_export(
+        make_settings(do_wireframes=False), MODEL_SIZE, FRAME_RANGES,
+        action_framings={ 'Walk': ((1.0, 1.0, 4.0), (0.0, 0.0, 2.0)) })
+    walk = next(job for job in jobs if job.action == 'Walk')
+    idle = next(job for job in jobs if job.action == 'Idle')
+    assert walk.camera.target == (0.0, 0.0, 2.0)
+    assert walk.camera.ortho_scale == 2 * idle.camera.ortho_scale
+
+def test_get_orbit_placements():
+    placements = plan.get_orbit_placements(8, [0.0, 30.0], 2.0)
+    assert placements.shape == (16, 6)
+    locations = placements[:, :3]
+    # (one ring per elevation, in turn, on a sphere of the given radius)
+    assert np.allclose(np.linalg.norm(locations, axis=1), 2.0)
+    assert np.allclose(locations[:8, 2], 0.0)
+    assert np.allclose(locations[8:, 2], 2.0 * np.sin(np.radians(30.0)))
+    # (starting from the front, evenly spaced angles)
+    assert np.allclose(locations[0], [0.0, -2.0, 0.0])
+    angles = np.arctan2(locations[:8, 1], locations[:8, 0])
+    assert np.allclose(np.diff(np.unwrap(angles)), 2 * np.pi / 8)
+    # (the cameras look at the origin: tilted by the elevation, turned by the angle)
+    assert np.allclose(placements[8:, 3], np.radians(60.0))
+    assert np.allclose(placements[:8, 5], np.unwrap(angles) + np.pi / 2)
+
+def test_parse_sizes():
+    assert plan.parse_sizes('3840x2160, 512X512 128x128') == [(3840, 2160), (512, 512), (128, 128)]
+    with pytest.raises(ValueError):
+        plan.parse_sizes('512x')
+    with pytest.raises(ValueError):
+        plan.parse_sizes('0x512')
+
+def test_dedupe_jobs_keeps_first():
+    jobs = plan.plan_export(make_settings(), MODEL_SIZE, FRAME_RANGES)
+    duplicate = jobs[3]._replace(action='Other')
+    deduped = plan.dedupe_jobs(jobs + [duplicate])
+    assert deduped == jobs
+
+def test_sort_jobs_groups_actions():
+    jobs = plan.plan_export(make_settings(), MODEL_SIZE, FRAME_RANGES)
+    sorted_jobs = plan.sort_jobs(jobs)
+    assert sorted(sorted_jobs) == sorted(jobs)
+    # (each action once, in the order of its first job)
+    actions = [job.action for job in sorted_jobs]
+    assert [a for i, a in enumerate(actions) if i == 0 or a != actions[i - 1]] == \
+        [None, 'Idle', 'Walk']
+    # (the planned order is kept inside each action)
+    for action in (None, 'Idle', 'Walk'):
+        assert [job for job in sorted_jobs if job.action == action] == \
+            [job for job in jobs if job.action == action]
+
+# == SHARDS AND BATCHES
+def test_shard_jobs_balances_frames():
+    jobs = plan.plan_export(make_settings(), MODEL_SIZE, FRAME_RANGES)
+    shards = plan.shard_jobs(jobs, 3)
+    assert sorted(job for shard in shards for job in shard) == sorted(jobs)
+    loads = [plan.plan_frame_count(shard) for shard in shards]
+    assert max(loads) - min(loads) <= 40
+    # (the planned order is kept inside each shard)
+    order = { job: i for i, job in enumerate(jobs) }
+    for shard in shards:
+        assert [order[job] for job in shard] == sorted(order[job] for job in shard)
+
+def test_shard_jobs_keeps_groups_together():
+    jobs = plan.plan_export(make_settings(), MODEL_SIZE, FRAME_RANGES)
+    shards = plan.shard_jobs(jobs, 4, by='action')
+    for shard in shards:
+        for action in set(job.action for job in shard):
+            assert all(job in shard for job in jobs if job.action == action)
+    with pytest.raises(ValueError):
+        plan.shard_jobs(jobs, 2, by='camera')
+
+def test_batch_jobs_default():
+    jobs = plan.plan_export(make_settings(), MODEL_SIZE, FRAME_RANGES)
+    batches = plan.batch_jobs(jobs, lambda job: plan.batch_key(job, False, False))
+    assert all(len(batch) == 1 for batch in batches)
+    assert len(batches) == len(jobs)
+
+def test_batch_jobs_frame_major():
+    jobs = plan.plan_export(make_settings(), MODEL_SIZE, FRAME_RANGES)
+    batches = plan.batch_jobs(jobs, lambda job: plan.batch_key(job, True, False))
+    clips = [batch for batch in batches if batch[0].kind == 'movie']
+    # (solid and wireframe clips of each POV and action together)
+    assert len(clips) == 4
+    assert all(sorted(job.wireframe for job in batch) == [False, True] for batch in clips)
+    assert plan.count_action_batches(batches) == { 'Idle': 2, 'Walk': 2 }
+
+def test_batch_jobs_multi_camera():
+    jobs = plan.plan_export(make_settings(), MODEL_SIZE, FRAME_RANGES)
+    batches = plan.batch_jobs(jobs, lambda job: plan.batch_key(job, False, True))
+    clips = [batch for batch in batches if batch[0].kind == 'movie']
+    # (all the POVs of each action and pass together)
+    assert len(clips) == 4
+    assert all(set(job.pov for job in batch) == { 'front', 'persp' } for batch in clips)
+    assert all(len(set(job.wireframe for job in batch)) == 1 for batch in clips)
+
+def test_select_and_skip_jobs():
+    jobs = plan.plan_export(make_settings(), MODEL_SIZE, FRAME_RANGES)
+    paths = [jobs[5].path, jobs[2].path]
+    assert plan.select_jobs(jobs, paths) == [jobs[2], jobs[5]]
+    hashes = { job.path: 'h' for job in jobs }
+    manifest = { jobs[0].path: 'h', jobs[1].path: 'old' }
+    pending = plan.skip_unchanged_jobs(jobs, hashes, manifest, lambda path: True)
+    assert pending == jobs[1:]
+
+def test_skip_completed_jobs():
+    jobs = plan.plan_export(make_settings(), MODEL_SIZE, FRAME_RANGES)[:5]
+    keys = { job.path: 'k' for job in jobs }
+    journal = {
+        jobs[0].path: { 'event': 'done', 'key': 'k', 'bytes': 10 },
+        # (started but interrupted)
+        jobs[1].path: { 'event': 'start', 'key': 'k', 'bytes': None },
+        # (completed with other settings)
+        jobs[2].path: { 'event': 'done', 'key': 'old', 'bytes': 10 },
+        # (completed, but the output was replaced since)
+        jobs[3].path: { 'event': 'done', 'key': 'k', 'bytes': 20 },
+    }
+    pending = plan.skip_completed_jobs(jobs, keys, journal, lambda path: 10)
+    assert pending == jobs[1:]
+
+# == ANIMATION SAMPLING
+def test_sample_keyframes():
+    co = np.array([[1, 0.0], [5, 2.0], [8, 2.0], [12, -1.0]])
+    left_handles = co - [1, 0]
+    right_handles = co + [1, 0]
+    # (linear, constant, bezier, linear)
+    interpolations = np.array([1, 0, 2, 1])
+    values, curved = plan.sample_keyframes(co, left_handles, right_handles, interpolations, (0, 14))
+    assert values[:6].tolist() == [0.0, 0.0, 0.5, 1.0, 1.5, 2.0]
+    assert values[6:9].tolist() == [2.0, 2.0, 2.0]
+    assert values[12:].tolist() == [-1.0, -1.0, -1.0]
+    # (only the frames inside the bezier segment need a full evaluation)
+    assert np.flatnonzero(curved).tolist() == [9, 10, 11]
+
+def test_get_pose_sources():
+    samples = np.array([[0, 1, 1, 1, 2, 2, 0]], dtype=np.float64)
+    assert plan.get_pose_sources(samples).tolist() == [0, 1, 1, 1, 4, 4, 6]
+
+def test_get_sheet_layout():
+    assert plan.get_sheet_layout(10, (100, 100), 400) == (4, 3, 1)
+    assert plan.get_sheet_layout(30, (100, 100), 400) == (4, 4, 2)
+    assert plan.get_sheet_layout(3, (1000, 1000), 400) == (1, 1, 3)
+
+# == IMAGE PROCESSING
+def test_crop_to_aspect():
+    pixels = np.arange(4 * 8).reshape(4, 8, 1)
+    # (wider than the target: the columns on both sides are cropped)
+    assert plan.crop_to_aspect(pixels, (2, 2)).tolist() == pixels[:, 2:6].tolist()
+    # (taller than the target: the rows on both sides are cropped)
+    assert plan.crop_to_aspect(pixels, (8, 2)).tolist() == pixels[1:3].tolist()
+
+def test_resample_pixels_averages_areas():
+    # (checkerboard of 2x2 blocks: each output pixel covers one block)
+    blocks = np.array([[0.0, 1.0], [1.0, 0.0]], dtype=np.float32)
+    pixels = np.kron(blocks, np.ones((2, 2), dtype=np.float32))[:, :, None]
+    assert np.allclose(plan.resample_pixels(pixels, (2, 2))[:, :, 0], blocks)
+    # (a single output pixel is the mean of the whole image)
+    assert np.allclose(plan.resample_pixels(pixels, (1, 1)), 0.5)
+    # (3 pixels to 2: the middle one is split between the outputs)
+    row = np.array([[[0.0], [3.0], [6.0]]], dtype=np.float32)
+    assert np.allclose(plan.resample_axis(row, 2, 1)[0, :, 0], [1.0, 5.0])
+
+def test_encode_png_round_trip():
+    pixels = np.random.RandomState(0).randint(0, 256, (3, 5, 4)).astype(np.uint8)
+    data = plan.encode_png(pixels, 90)
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    chunks = {}
+    offset = 8
+    while offset < len(data):
+        length, = struct.unpack('>I', data[offset:offset + 4])
+        tag = data[offset + 4:offset + 8]
+        body = data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack('>I', data[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(tag + body)
+        chunks[tag] = body
+        offset += 12 + length
+    assert struct.unpack('>IIBBBBB', chunks[b'IHDR']) == (5, 3, 8, 6, 0, 0, 0)
+    # (each row starts with its filter type, 0 for none)
+    rows = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8).reshape(3, -1)
+    assert (rows[:, 0] == 0).all()
+    assert rows[:, 1:].reshape(3, 5, 4).tolist() == pixels.tolist()
+    assert chunks[b'IEND'] == b''